@@ -1,43 +1,206 @@
 # api.py
-from datetime import datetime
-from fastapi import FastAPI
-import requests
-from config import HEADERS, NFL_EVENTS_URL, ODDS_URL, SCOREBOARD_URL, SCORING_PLAYS_URL
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
+from plotly.utils import PlotlyJSONEncoder
+from config import STREAM_HEARTBEAT, REPRESENTATIONS_SIZE
+from game_cards import LIVE_COMPONENTS, render_live_component
+import logos
+from poller import scoreboard_poller, game_is_final
+import metrics
+from quota import scheduler as quota_scheduler
+from shared_cache import backend as shared_backend
+import upstream
+import utils
 
 app = FastAPI()
 
+# The routes read the same in-process caches, odds store and scoreboard poller as the Dash
+# callbacks (utils.py, poller.py), so API consumers and browser sessions share every upstream
+# call. Those functions are synchronous; the async routes hand them to the threadpool instead
+# of blocking the event loop.
+
+# Per-resource ETag state for conditional GETs: (path, params) -> (payload, body, etag, version),
+# least recently used first. Holding the payload lets an unchanged cached object (e.g. the season
+# feed) skip re-encoding.
+_representations = OrderedDict()
+_representations_lock = threading.Lock()
+
+def _shared_version(key, etag):
+    """Return the resource's version for etag, counted in the shared backend so every worker agrees."""
+    path, params = key
+    resource = '&'.join(params)
+
+    def bump(state):
+        state = state or {'counter': 0, 'etags': {}}
+        known = state['etags'].get(resource)
+        if known is not None and known[0] == etag:
+            return state, known[1]
+        state['counter'] += 1
+        state['etags'].pop(resource, None)
+        state['etags'][resource] = [etag, state['counter']]
+        while len(state['etags']) > REPRESENTATIONS_SIZE:
+            del state['etags'][next(iter(state['etags']))]
+        return state, state['counter']
+
+    return shared_backend.transact(f"representation:{path}", bump)
+
+def conditional_json(request, payload, *params):
+    """Return payload as JSON with an ETag and X-Content-Version, or 304 if If-None-Match matches.
+
+    params are the query values that identify the resource."""
+    key = (request.url.path, tuple(str(param) for param in params))
+    with _representations_lock:
+        previous = _representations.get(key)
+        if previous is not None:
+            _representations.move_to_end(key)
+    if previous is not None and previous[0] is payload:
+        _, body, etag, version = previous
+    else:
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if previous is not None and previous[2] == etag:
+            version = previous[3]
+        else:
+            version = _shared_version(key, etag)
+        with _representations_lock:
+            _representations[key] = (payload, body, etag, version)
+            if len(_representations) > REPRESENTATIONS_SIZE:
+                _representations.popitem(last=False)
+
+    headers = {'ETag': etag, 'X-Content-Version': str(version), 'Cache-Control': 'no-cache'}
+    stale_reason = upstream.stale_reason()
+    if stale_reason:
+        headers[upstream.STALE_HEADER] = stale_reason
+    if_none_match = request.headers.get('If-None-Match', '')
+    if if_none_match == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+@app.get("/metrics")
+async def fetch_metrics():
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
+
+@app.get("/quota")
+async def fetch_quota():
+    # Upstream spend against the configured budget and when it is projected to run out
+    return quota_scheduler.status()
+
+@app.get("/logos/{name}")
+async def fetch_logo(name: str):
+    # Team logo thumbnails linked by utils.extract_game_info and format_scoring_plays
+    try:
+        path = await run_in_threadpool(logos.thumbnail, name)
+    except (httpx.HTTPError, OSError):
+        # Show the original logo until a retry after logos.FAILURE_RETRY manages to fetch it
+        return RedirectResponse(logos.source_url(name), headers={'Cache-Control': 'no-store'})
+    if path is None:
+        return Response(status_code=404)
+    return FileResponse(path, media_type='image/png', headers={'Cache-Control': logos.CACHE_CONTROL})
+
 @app.get("/nfl-events")
-def fetch_nfl_events():
-    querystring = {"year": "2024"}
-    response = requests.get(NFL_EVENTS_URL, headers=HEADERS, params=querystring)
-    if response.status_code == 200:
-        return response.json()
-    return {"error": "Failed to fetch NFL events"}
+async def fetch_nfl_events(request: Request):
+    data = await run_in_threadpool(utils.fetch_nfl_events)  # Served from the process-wide season cache
+    if data:
+        return conditional_json(request, data)
+    return JSONResponse({"error": "Failed to fetch NFL events"}, status_code=503)
 
 @app.get("/nfl-eventodds")
-def fetch_espn_bet_odds(game_id: str, game_status: str):
-    querystring = {"id": game_id}
-    response = requests.get(ODDS_URL, headers=HEADERS, params=querystring)
-    if response.status_code == 200:
-        odds_data = response.json()
-        for item in odds_data.get('items', []):
-            if item.get('provider', {}).get('id') == "58":  # ESPN BET Provider ID
-                return item.get('details', 'N/A')
-    return {"error": "Failed to fetch odds"}
+async def fetch_espn_bet_odds(request: Request, game_id: str, game_status: str):
+    # Odds for games already under way come from the shared odds store without an upstream call
+    odds = await run_in_threadpool(utils.fetch_espn_bet_odds, game_id, game_status, utils.odds_store)
+    if odds is not None:
+        return conditional_json(request, odds, game_id, game_status)
+    return JSONResponse({"error": "Failed to fetch odds"}, status_code=503)
 
 @app.get("/nfl-scoreboard-day")
-def fetch_games_by_day():
-    today = datetime.now().strftime('%Y%m%d')
-    querystring = {"day": today}
-    response = requests.get(SCOREBOARD_URL, headers=HEADERS, params=querystring)
-    if response.status_code == 200:
-        return response.json()
-    return {"error": "Failed to fetch games"}
+async def fetch_games_by_day(request: Request):
+    # The scoreboard the poller last published; only fetched directly before its first poll
+    data = scoreboard_poller.snapshot()['feed'] or await run_in_threadpool(utils.fetch_games_by_day)
+    if data:
+        return conditional_json(request, data)
+    return JSONResponse({"error": "Failed to fetch games"}, status_code=503)
 
 @app.get("/nfl-scoringplays")
-def get_scoring_plays(game_id: str):
-    querystring = {"id": game_id}
-    response = requests.get(SCORING_PLAYS_URL, headers=HEADERS, params=querystring)
-    if response.status_code == 200:
-        return response.json().get('scoringPlays', [])
-    return {"error": "Failed to fetch scoring plays"}
\ No newline at end of file
+async def get_scoring_plays(request: Request, game_id: str):
+    final = await run_in_threadpool(game_is_final, game_id)
+    scoring_plays = await run_in_threadpool(utils.fetch_scoring_plays, game_id, final)
+    if scoring_plays is not None:
+        return conditional_json(request, scoring_plays, game_id)
+    return JSONResponse({"error": "Failed to fetch scoring plays"}, status_code=503)
+
+
+# Encoded score events keyed by (from_version, to_version), shared by every stream client on the
+# same version so each delta is rendered once per version rather than once per connection
+_score_events = {}
+_score_events_lock = threading.Lock()
+
+def score_event(since_version):
+    """Return (version, SSE message) carrying live component patches for games changed since a version."""
+    snapshot = scoreboard_poller.snapshot()
+    stale_reason = upstream.stale_reason()
+    key = (since_version, snapshot['version'], stale_reason)
+    with _score_events_lock:
+        message = _score_events.get(key)
+    if message is not None:
+        return snapshot['version'], message
+
+    changed_games = scoreboard_poller.changes_since(since_version)
+    games = snapshot['games']
+    if changed_games is not None:
+        games = {game_id: games[game_id] for game_id in changed_games if game_id in games}
+    patches = [
+        {'id': {'type': component_type, 'index': game_id},
+         'children': render_live_component(component_type, live_scores)}
+        for game_id, live_scores in games.items()
+        for component_type in LIVE_COMPONENTS
+    ]
+    data = json.dumps({'version': snapshot['version'], 'in_progress': snapshot['in_progress'],
+                       'stale': stale_reason, 'patches': patches},
+                      cls=PlotlyJSONEncoder, separators=(',', ':'))
+    message = f"id: {snapshot['version']}\nevent: scores\ndata: {data}\n\n"
+
+    with _score_events_lock:
+        if any(cached_key[1:] != key[1:] for cached_key in _score_events):
+            _score_events.clear()  # Drop deltas for superseded versions or staleness
+        _score_events[key] = message
+    return snapshot['version'], message
+
+async def _score_stream(version):
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def notify():
+        loop.call_soon_threadsafe(changed.set)
+
+    scoreboard_poller.subscribe(notify)
+    stale_reason = None
+    try:
+        while True:
+            changed.clear()
+            # Staleness changes without a new snapshot during an outage, so it is checked on every wake
+            if scoreboard_poller.snapshot()['version'] != version or upstream.stale_reason() != stale_reason:
+                stale_reason = upstream.stale_reason()
+                version, message = score_event(version)
+                yield message
+            try:
+                await asyncio.wait_for(changed.wait(), STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"  # Comment line so proxies keep the idle connection open
+    finally:
+        scoreboard_poller.unsubscribe(notify)
+
+@app.get("/stream/scores")
+async def stream_scores(request: Request, since: int = None):
+    # EventSource sends the last received event id (the snapshot version) when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    version = int(last_event_id) if last_event_id.isdigit() else since
+    return StreamingResponse(_score_stream(version), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'})
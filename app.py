@@ -1,49 +1,50 @@
 # app.py
-import threading
 import uvicorn
-import dash
+from a2wsgi import WSGIMiddleware
 import dash_bootstrap_components as dbc
 from flask import Flask
-from config import PORT
+from starlette.middleware.gzip import GZipMiddleware
+from config import PORT, COMPRESS_MIN_SIZE
 from layout import layout
 from callbacks import register_callbacks
 from api import app as fastapi_app
-import socket
+from poller import scoreboard_poller
+from metrics import instrument_dash
+from logs import configure_logging
+from static_assets import FingerprintedDash, set_cache_headers
+import warmup
+
+configure_logging()
 
 # Initialize Flask server
 server = Flask(__name__)
 
-# Add cache-control headers to prevent browser caching
-@server.after_request
-def add_header(response):
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '-1'
-    return response
+# Cache fingerprinted assets for a year, revalidate pages and never store callback responses
+server.after_request(set_cache_headers)
+
+# Record per-callback timing and response sizes for /metrics
+instrument_dash(server)
 
-# Initialize Dash app with Flask server
-app = dash.Dash(__name__, server=server, external_stylesheets=[dbc.themes.BOOTSTRAP], title="NFL Games")
+# Initialize Dash app with Flask server; asset links carry a hash of their content
+app = FingerprintedDash(__name__, server=server, external_stylesheets=[dbc.themes.BOOTSTRAP], title="NFL Games")
 
 # Set up layout and callbacks
 app.layout = layout
 register_callbacks(app)
 
-# Function to check if a port is in use
-def is_port_in_use(port):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('127.0.0.1', port)) == 0
+# ASGI entry point: the FastAPI routes (including the live score stream) with Dash mounted beneath
+# them, so long-lived stream connections sit on the event loop instead of pinning WSGI threads.
+# Both run in this process and share its caches; there is no separate API server.
+# Dash responses over COMPRESS_MIN_SIZE bytes (callback payloads, bundles, the stylesheet) are gzipped.
+fastapi_app.mount("/", GZipMiddleware(WSGIMiddleware(server, workers=8), minimum_size=COMPRESS_MIN_SIZE))
+asgi_app = fastapi_app
 
-# Function to run FastAPI server
-def run_fastapi():
-    if not is_port_in_use(8001):
-        uvicorn.run(fastapi_app, host="127.0.0.1", port=8001)
-    else:
-        print("FastAPI server is already running.")
+# Serve the first sessions from the last snapshot while the caches refill in the background
+warmup.start()
 
-# Start FastAPI server in a separate thread
-fastapi_thread = threading.Thread(target=run_fastapi, daemon=True)
-fastapi_thread.start()
+# Start the shared scoreboard poller that feeds every session's update_scores callback
+scoreboard_poller.start()
 
-# Run Dash server
+# Run the combined Dash and API server
 if __name__ == "__main__":
-    app.run_server(debug=True, port=PORT)
\ No newline at end of file
+    uvicorn.run(asgi_app, host="0.0.0.0", port=PORT)
\ No newline at end of file
@@ -0,0 +1,59 @@
+// live_scores.js
+// Subscribes to the server's live score stream and patches each game's score, status and
+// possession components in place, along with the note shown while upstream data may be out of
+// date. While the stream is connected the interval-scores poll is disabled; if the stream
+// drops, polling resumes until EventSource reconnects.
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+
+    function setProps(id, props) {
+        if (window.dash_clientside && window.dash_clientside.set_props) {
+            window.dash_clientside.set_props(id, props);
+        }
+    }
+
+    function domId(id) {
+        // Same encoding Dash uses for pattern-matching ids: keys sorted, no whitespace
+        return JSON.stringify(id, Object.keys(id).sort());
+    }
+
+    function connect() {
+        var source = new EventSource('/stream/scores');
+        var inProgress = null;
+        var stale;
+
+        source.onopen = function () {
+            setProps('interval-scores', {disabled: true});
+        };
+
+        source.onerror = function () {
+            setProps('interval-scores', {disabled: false});
+        };
+
+        source.addEventListener('scores', function (event) {
+            var update = JSON.parse(event.data);
+            update.patches.forEach(function (patch) {
+                // Only games of the selected week are on the page
+                if (document.getElementById(domId(patch.id))) {
+                    setProps(patch.id, {children: patch.children});
+                }
+            });
+            setProps('scores-version', {data: update.version});
+            if (update.in_progress !== inProgress) {
+                // in-progress-flag drives a server callback, so only write it when it flips
+                inProgress = update.in_progress;
+                setProps('in-progress-flag', {data: inProgress});
+            }
+            if (update.stale !== stale) {
+                // stale-reason drives the out-of-date note, which polling no longer refreshes
+                stale = update.stale;
+                setProps('stale-reason', {data: stale});
+            }
+        });
+    }
+
+    // Wait for the Dash renderer so set_props has a store to write to
+    window.addEventListener('load', connect);
+})();
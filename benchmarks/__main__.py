@@ -0,0 +1,252 @@
+# benchmarks/__main__.py
+"""Benchmark the render, ingest and startup hot paths against full-season fixtures.
+
+Run from the repository root with ``python -m benchmarks``; results go to benchmarks/history.jsonl.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'history.jsonl')
+STARTUP_REPEAT = 3  # Fresh processes per startup benchmark; each takes a few seconds
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# Point the app at an isolated odds log and at the replay server before config is imported
+_workdir = tempfile.mkdtemp(prefix='nfl-dash-bench-')
+_replay_port = _free_port()
+os.environ.update({
+    'UPSTREAM_MODE': 'replay',
+    'REPLAY_PORT': str(_replay_port),
+    'REPLAY_LATENCY': '0',
+    'ODDS_LOG_PATH': os.path.join(_workdir, 'odds.jsonl'),
+    'CACHE_SQLITE_PATH': os.path.join(_workdir, 'cache.sqlite3'),
+    'SNAPSHOT_DIR': '',
+    'API_KEY': 'benchmark',
+})
+
+import dash  # noqa: E402
+import dash_bootstrap_components as dbc  # noqa: E402
+import uvicorn  # noqa: E402
+from flask import Flask  # noqa: E402
+from config import NFL_SEASON  # noqa: E402
+from benchmarks.fixtures import build_season, write_corpus, LIVE_WEEK, GAMES_PER_WEEK  # noqa: E402
+
+
+def _measure(func, repeat):
+    """Return (wall-time samples in ms, peak traced allocation in KB, last result)."""
+    result = func()  # Warm caches so the samples measure steady state
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return samples, peak / 1024, result
+
+
+def _summary(samples, peak_kb, payload_bytes=None):
+    samples = sorted(samples)
+    summary = {
+        'wall_ms_median': round(statistics.median(samples), 3),
+        'wall_ms_p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'alloc_peak_kb': round(peak_kb, 1),
+    }
+    if payload_bytes is not None:
+        summary['payload_bytes'] = payload_bytes
+    return summary
+
+
+def _callback_id(app, *fragments):
+    return next(key for key in app.callback_map if all(fragment in key for fragment in fragments))
+
+
+def _live_outputs(game_ids):
+    from game_cards import LIVE_COMPONENTS
+    return [[{'id': {'type': component_type, 'index': game_id}, 'property': 'children'} for game_id in game_ids]
+            for component_type in LIVE_COMPONENTS]
+
+
+def _start_replay_server(corpus, port, latency):
+    import replay
+    config = uvicorn.Config(replay.create_replay_app(corpus, speed=1, latency=latency),
+                            host='127.0.0.1', port=port, log_level='warning')
+    threading.Thread(target=uvicorn.Server(config).run, daemon=True).start()
+    time.sleep(1)
+
+
+def _startup_probe(replay_port, snapshot_dir):
+    """Run benchmarks.startup in a fresh process with its own odds log and cache, returning its report."""
+    state_dir = tempfile.mkdtemp(dir=_workdir)
+    env = dict(os.environ, REPLAY_PORT=str(replay_port), SNAPSHOT_DIR=snapshot_dir, LOG_LEVEL='WARNING',
+               ODDS_LOG_PATH=os.path.join(state_dir, 'odds.jsonl'),
+               CACHE_SQLITE_PATH=os.path.join(state_dir, 'cache.sqlite3'))
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.startup', str(time.time())], env=env,
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_startup(corpus):
+    """Time cold starts, each leaving a snapshot behind, and warm starts from it; alloc_peak_kb is peak RSS."""
+    replay_port = _free_port()
+    _start_replay_server(corpus, replay_port, latency=True)
+    cold, warm = [], []
+    for _ in range(STARTUP_REPEAT):
+        snapshot_dir = tempfile.mkdtemp(dir=_workdir)
+        cold.append(_startup_probe(replay_port, snapshot_dir))
+        warm.append(_startup_probe(replay_port, snapshot_dir))
+    return {
+        f'startup_first_response_{name}': _summary([report['first_response_s'] * 1000 for report in reports],
+                                                   max(report['max_rss_kb'] for report in reports))
+        for name, reports in (('cold', cold), ('warm', warm))
+    }
+
+
+def run(repeat):
+    import replay
+    from layout import layout
+    from callbacks import register_callbacks
+    from poller import scoreboard_poller
+    from utils import extract_game_info, fetch_nfl_events, fetch_week_odds, odds_store
+    from week_index import WeekIndex
+
+    feed, scoreboard = build_season()
+    corpus = replay.Corpus(write_corpus(os.path.join(_workdir, 'corpus.jsonl'), feed, scoreboard, NFL_SEASON))
+    _start_replay_server(corpus, _replay_port, latency=False)
+
+    app = dash.Dash(__name__, server=Flask(__name__), external_stylesheets=[dbc.themes.BOOTSTRAP])
+    app.layout = layout
+    register_callbacks(app)
+    client = app.server.test_client()
+
+    def post(body):
+        response = client.post('/_dash-update-component', json=body)
+        return len(response.data)
+
+    fetch_nfl_events()
+    scoreboard_poller.poll_once()
+    live_game_ids = [event['id'] for event in feed['events'][LIVE_WEEK * GAMES_PER_WEEK:(LIVE_WEEK + 1) * GAMES_PER_WEEK]]
+    results = {}
+
+    samples, peak, _ = _measure(lambda: WeekIndex(feed), repeat)
+    results['ingest_week_index_full_season'] = _summary(samples, peak)
+
+    events = feed['events']
+    week_odds = fetch_week_odds(events, odds_store)
+    samples, peak, _ = _measure(lambda: [extract_game_info(event, week_odds.get(event['id'])) for event in events],
+                                repeat)
+    results['extract_game_info_full_season'] = _summary([sample / len(events) for sample in samples], peak / len(events))
+
+    week_options_body = {
+        'output': _callback_id(app, 'week-selector.options'),
+        'outputs': [{'id': 'week-selector', 'property': 'options'}, {'id': 'week-options-store', 'property': 'data'},
+                    {'id': 'week-selector', 'property': 'value'}, {'id': 'season-version', 'property': 'data'}],
+        'inputs': [{'id': 'week-options-store', 'property': 'data', 'value': False}],
+        'changedPropIds': ['week-options-store.data'],
+    }
+    samples, peak, size = _measure(lambda: post(week_options_body), repeat)
+    results['update_week_options'] = _summary(samples, peak, size)
+    season_version = client.post('/_dash-update-component', json=week_options_body).get_json()['response'][
+        'season-version']['data']
+
+    for name, week in (('display_game_info_live_week', LIVE_WEEK), ('display_game_info_final_week', 0),
+                       ('display_game_info_scheduled_week', LIVE_WEEK + 1)):
+        body = {
+            'output': _callback_id(app, 'game-info.children'),
+            'outputs': [{'id': 'game-info', 'property': 'children'}, {'id': 'in-progress-flag', 'property': 'data'},
+                        {'id': 'scores-version', 'property': 'data'}, {'id': 'week-options-store', 'property': 'data'},
+                        {'id': 'stale-reason', 'property': 'data'}],
+            'inputs': [{'id': 'week-selector', 'property': 'value', 'value': week}],
+            'state': [{'id': 'season-version', 'property': 'data', 'value': season_version}],
+            'changedPropIds': ['week-selector.value'],
+        }
+        samples, peak, size = _measure(lambda body=body: post(body), repeat)
+        results[name] = _summary(samples, peak, size)
+
+    update_scores_id = _callback_id(app, 'scores-version.data', 'home-score')
+    version = scoreboard_poller.snapshot()['version']
+    for name, seen_version in (('update_scores_live_week_full', 0), ('update_scores_live_week_unchanged', version)):
+        body = {
+            'output': update_scores_id,
+            'outputs': _live_outputs(live_game_ids) + [
+                {'id': 'in-progress-flag', 'property': 'data'}, {'id': 'scores-version', 'property': 'data'},
+                {'id': 'interval-scores', 'property': 'interval'}, {'id': 'stale-reason', 'property': 'data'}],
+            'inputs': [{'id': 'interval-scores', 'property': 'n_intervals', 'value': 1}],
+            'state': [{'id': 'scores-version', 'property': 'data', 'value': seen_version},
+                      {'id': 'interval-scores', 'property': 'interval', 'value': 30000},
+                      {'id': 'stale-reason', 'property': 'data', 'value': None}],
+            'changedPropIds': ['interval-scores.n_intervals'],
+        }
+        samples, peak, size = _measure(lambda body=body: post(body), repeat)
+        results[name] = _summary(samples, peak, size)
+
+    results.update(run_startup(corpus))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_run():
+    try:
+        with open(HISTORY_PATH, 'r') as f:
+            lines = [line for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def _report(results, previous):
+    baseline = previous['results'] if previous else {}
+    print(f"{'benchmark':40} {'median ms':>10} {'p95 ms':>10} {'alloc KB':>10} {'payload B':>10} {'vs prev':>8}")
+    for name, result in results.items():
+        change = ''
+        if name in baseline and baseline[name]['wall_ms_median']:
+            change = f"{(result['wall_ms_median'] / baseline[name]['wall_ms_median'] - 1) * 100:+.0f}%"
+        print(f"{name:40} {result['wall_ms_median']:>10} {result['wall_ms_p95']:>10} "
+              f"{result['alloc_peak_kb']:>10} {result.get('payload_bytes', ''):>10} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per benchmark')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    previous = _previous_run()
+    _report(results, previous)
+
+    if not args.no_save:
+        entry = {'timestamp': time.time(), 'commit': _git_commit(), 'python': platform.python_version(),
+                 'repeat': args.repeat, 'results': results}
+        with open(HISTORY_PATH, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
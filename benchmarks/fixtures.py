@@ -0,0 +1,131 @@
+# benchmarks/fixtures.py
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+WEEKS = 18
+GAMES_PER_WEEK = 16
+LIVE_WEEK = 9  # Week number (0-based) that contains the current time, with every game in progress
+# Typical RapidAPI response times in seconds, replayed when the replay server reproduces latency
+RESPONSE_TIMES = {'nfl-events': 0.8, 'nfl-scoreboard-day': 0.3, 'nfl-eventodds': 0.2, 'nfl-scoringplays': 0.2}
+TEAMS = [
+    ('ARI', 'Arizona Cardinals'), ('ATL', 'Atlanta Falcons'), ('BAL', 'Baltimore Ravens'),
+    ('BUF', 'Buffalo Bills'), ('CAR', 'Carolina Panthers'), ('CHI', 'Chicago Bears'),
+    ('CIN', 'Cincinnati Bengals'), ('CLE', 'Cleveland Browns'), ('DAL', 'Dallas Cowboys'),
+    ('DEN', 'Denver Broncos'), ('DET', 'Detroit Lions'), ('GB', 'Green Bay Packers'),
+    ('HOU', 'Houston Texans'), ('IND', 'Indianapolis Colts'), ('JAX', 'Jacksonville Jaguars'),
+    ('KC', 'Kansas City Chiefs'), ('LV', 'Las Vegas Raiders'), ('LAC', 'Los Angeles Chargers'),
+    ('LAR', 'Los Angeles Rams'), ('MIA', 'Miami Dolphins'), ('MIN', 'Minnesota Vikings'),
+    ('NE', 'New England Patriots'), ('NO', 'New Orleans Saints'), ('NYG', 'New York Giants'),
+    ('NYJ', 'New York Jets'), ('PHI', 'Philadelphia Eagles'), ('PIT', 'Pittsburgh Steelers'),
+    ('SF', 'San Francisco 49ers'), ('SEA', 'Seattle Seahawks'), ('TB', 'Tampa Bay Buccaneers'),
+    ('TEN', 'Tennessee Titans'), ('WSH', 'Washington Commanders'),
+]
+
+
+def _timestamp(moment):
+    return moment.strftime('%Y-%m-%dT%H:%MZ')
+
+
+def _team(index):
+    abbreviation, name = TEAMS[index]
+    return {
+        'id': str(index + 1),
+        'abbreviation': abbreviation,
+        'displayName': name,
+        'color': f"{(index * 7919) % 0xFFFFFF:06x}",
+        'logo': f"https://a.espncdn.com/i/teamlogos/nfl/500/{abbreviation.lower()}.png",
+    }
+
+
+def _event(game_id, kickoff, home, away, state, rng):
+    status = {
+        'pre': {'description': 'Scheduled', 'state': 'pre'},
+        'in': {'description': 'In Progress', 'state': 'in'},
+        'post': {'description': 'Final', 'state': 'post'},
+    }[state]
+    competition = {
+        'competitors': [
+            {'team': _team(home), 'score': str(rng.randint(0, 35)) if state != 'pre' else '0',
+             'records': [{'summary': f"{rng.randint(0, 9)}-{rng.randint(0, 9)}"}]},
+            {'team': _team(away), 'score': str(rng.randint(0, 35)) if state != 'pre' else '0',
+             'records': [{'summary': f"{rng.randint(0, 9)}-{rng.randint(0, 9)}"}]},
+        ],
+        'venue': {'fullName': f"{TEAMS[home][1]} Stadium", 'address': {'city': TEAMS[home][1].rsplit(' ', 1)[0]}},
+        'broadcast': rng.choice(['CBS', 'FOX', 'NBC', 'ESPN', 'Prime Video']),
+        'status': {'period': 2 if state == 'in' else 0, 'displayClock': '7:32', 'type': status},
+    }
+    if state == 'in':
+        competition['situation'] = {'possession': _team(home)['id'], 'downDistanceText': '2nd & 7 at KC 35',
+                                    'possessionText': 'KC 35'}
+    return {
+        'id': str(game_id),
+        'date': _timestamp(kickoff),
+        'competitions': [competition],
+        'status': competition['status'],
+    }
+
+
+def build_season(now=None, seed=2024):
+    """Build a full regular-season events feed and the scoreboard of the live week LIVE_WEEK."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc) if now is None else now
+    season_start = (now - timedelta(weeks=LIVE_WEEK, days=3)).replace(minute=0, second=0, microsecond=0)
+
+    entries = []
+    events = []
+    for week in range(WEEKS):
+        week_start = season_start + timedelta(weeks=week)
+        week_end = week_start + timedelta(weeks=1, minutes=-1)
+        entries.append({'label': f"Week {week + 1}", 'startDate': _timestamp(week_start),
+                        'endDate': _timestamp(week_end)})
+        state = 'post' if week < LIVE_WEEK else 'in' if week == LIVE_WEEK else 'pre'
+        matchups = list(range(len(TEAMS)))
+        rng.shuffle(matchups)
+        for game in range(GAMES_PER_WEEK):
+            # Live-week games kicked off within the last hour so they count as in progress
+            kickoff = now - timedelta(minutes=30 + game) if state == 'in' else week_start + timedelta(days=3, hours=game % 4)
+            game_id = 401671000 + week * GAMES_PER_WEEK + game
+            events.append(_event(game_id, kickoff, matchups[2 * game], matchups[2 * game + 1], state, rng))
+
+    feed = {
+        'leagues': [{'calendar': [{'label': 'Regular Season', 'entries': entries}]}],
+        'events': events,
+    }
+    live_week_events = events[LIVE_WEEK * GAMES_PER_WEEK:(LIVE_WEEK + 1) * GAMES_PER_WEEK]
+    scoreboard = {'events': [{'id': event['id'], 'competitions': event['competitions']} for event in live_week_events]}
+    return feed, scoreboard
+
+
+def build_odds(event, rng):
+    abbreviation = event['competitions'][0]['competitors'][0]['team']['abbreviation']
+    return {'items': [{'provider': {'id': '58'}, 'details': f"{abbreviation} -{rng.randint(1, 20) / 2}"}]}
+
+
+def build_scoring_plays(event, rng):
+    competitors = event['competitions'][0]['competitors']
+    return {'scoringPlays': [
+        {'team': competitors[play % 2]['team'], 'period': {'number': play // 2 + 1},
+         'clock': {'displayValue': f"{rng.randint(0, 14)}:{rng.randint(0, 59):02d}"},
+         'text': 'Touchdown pass', 'awayScore': play * 3, 'homeScore': play * 4}
+        for play in range(8)
+    ]}
+
+
+def write_corpus(path, feed, scoreboard, season, seed=2024):
+    """Write the fixtures as a replay corpus (see replay.py) and return its path."""
+    rng = random.Random(seed)
+    recorded_at = time.time()
+
+    def entry(endpoint, params, body):
+        return {'t': recorded_at, 'elapsed': RESPONSE_TIMES[endpoint], 'path': f"/{endpoint}", 'params': params,
+                'status': 200, 'content_type': 'application/json', 'body': json.dumps(body)}
+
+    with open(path, 'w') as f:
+        f.write(json.dumps(entry('nfl-events', {'year': season}, feed)) + '\n')
+        f.write(json.dumps(entry('nfl-scoreboard-day', {'day': 'any'}, scoreboard)) + '\n')
+        for event in feed['events']:
+            f.write(json.dumps(entry('nfl-eventodds', {'id': event['id']}, build_odds(event, rng))) + '\n')
+            f.write(json.dumps(entry('nfl-scoringplays', {'id': event['id']}, build_scoring_plays(event, rng))) + '\n')
+    return path
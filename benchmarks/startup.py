@@ -0,0 +1,46 @@
+# benchmarks/startup.py
+"""Time a fresh process from spawn (argv[1]) to its first rendered week; prints one JSON line."""
+import json
+import resource
+import sys
+import time
+
+
+def _post(client, app, output, outputs, inputs, state=()):
+    callback_id = next(key for key in app.callback_map if output in key)
+    response = client.post('/_dash-update-component', json={
+        'output': callback_id, 'outputs': outputs, 'inputs': inputs, 'state': list(state),
+        'changedPropIds': [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"{output} returned {response.status_code}")
+    return response.get_json()['response']
+
+
+def main():
+    spawned_at = float(sys.argv[1])
+    import app
+    imported_at = time.time()
+
+    client = app.server.test_client()
+    week_options = _post(client, app.app, 'week-selector.options', [
+        {'id': 'week-selector', 'property': 'options'}, {'id': 'week-options-store', 'property': 'data'},
+        {'id': 'week-selector', 'property': 'value'}, {'id': 'season-version', 'property': 'data'},
+    ], [{'id': 'week-options-store', 'property': 'data', 'value': False}])
+    _post(client, app.app, 'game-info.children', [
+        {'id': 'game-info', 'property': 'children'}, {'id': 'in-progress-flag', 'property': 'data'},
+        {'id': 'scores-version', 'property': 'data'}, {'id': 'week-options-store', 'property': 'data'},
+        {'id': 'stale-reason', 'property': 'data'},
+    ], [{'id': 'week-selector', 'property': 'value', 'value': week_options['week-selector']['value']}],
+        [{'id': 'season-version', 'property': 'data', 'value': week_options['season-version']['data']}])
+    first_response_at = time.time()
+
+    print(json.dumps({
+        'import_s': imported_at - spawned_at,
+        'first_response_s': first_response_at - spawned_at,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# breaker.py
+"""Per-endpoint failure-rate circuit breakers for upstream requests, one set per process."""
+import logging
+import threading
+import time
+from collections import deque
+import httpx
+from config import BREAKER_FAILURE_RATE, BREAKER_MIN_REQUESTS, BREAKER_WINDOW, BREAKER_COOLDOWN
+from metrics import UPSTREAM_BREAKER_STATE, UPSTREAM_BREAKER_OPENED
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half-open', 'open'
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}  # For the upstream_breaker_state gauge
+
+
+class CircuitOpen(httpx.TransportError):
+    """Raised instead of sending a request to an endpoint whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with half-open probing for one upstream endpoint."""
+
+    def __init__(self, endpoint, failure_rate=BREAKER_FAILURE_RATE, min_requests=BREAKER_MIN_REQUESTS,
+                 window=BREAKER_WINDOW, cooldown=BREAKER_COOLDOWN):
+        self.endpoint = endpoint
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self._outcomes = deque()  # (time.monotonic(), succeeded) for requests in the last window
+        self._state = CLOSED
+        self._opened_at = 0
+        self._probing = False  # Whether the half-open probe is in flight
+        self._lock = threading.Lock()
+        UPSTREAM_BREAKER_STATE.labels(endpoint).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return whether a request may be sent now; each allowed request needs a record() or cancel()."""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def cancel(self):
+        """Give back an allowed request that was not sent after all."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, succeeded):
+        """Record the outcome of a request allowed by allow()."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+                if succeeded:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                    logger.info("Circuit closed for %s", self.endpoint)
+                else:
+                    self._open(now)
+                return
+            if self._state == OPEN:
+                return  # A request sent before the breaker opened
+
+            self._outcomes.append((now, succeeded))
+            while self._outcomes[0][0] <= now - self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_requests and failures >= self.failure_rate * len(self._outcomes):
+                self._open(now)
+
+    def _open(self, now):
+        self._opened_at = now
+        self._outcomes.clear()
+        self._set_state(OPEN)
+        UPSTREAM_BREAKER_OPENED.labels(self.endpoint).inc()
+        logger.warning("Circuit opened for %s for %s seconds", self.endpoint, self.cooldown)
+
+    def _set_state(self, state):
+        self._state = state
+        UPSTREAM_BREAKER_STATE.labels(self.endpoint).set(_STATE_VALUES[state])
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint):
+    """Return the process-wide breaker for an upstream endpoint path."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def any_open():
+    """Return whether any endpoint's breaker is currently refusing requests."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return any(breaker.state != CLOSED for breaker in breakers)
@@ -0,0 +1,160 @@
+# cache.py
+import logging
+import threading
+import time
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+SHARED_LOAD_TIMEOUT = 30  # Longest wait for another process loading the same key before loading it here
+SHARED_LOAD_POLL = 0.1  # Seconds between checks of the shared backend while another process loads
+
+
+class Uncached:
+    """Loader result that is returned to the caller but not stored, such as a stale upstream fallback."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TTLCache:
+    """Thread-safe TTL cache with stale-while-revalidate, optionally backed by a shared_cache backend."""
+
+    def __init__(self, ttl, stale_ttl=0, name='default', backend=None):
+        self.name = name  # Label for cache lookup metrics and key prefix in the shared backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend
+        self._entries = {}  # key -> (value, fetched_at, ttl, stale_ttl)
+        self._loading = {}  # key -> threading.Event set when the load finishes
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() when it is missing or expired."""
+        ttl = self.ttl if ttl is None else ttl
+        adopted = self.backend is None
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    value, fetched_at, entry_ttl, stale_ttl = entry
+                    age = time.time() - fetched_at
+                    if age < entry_ttl:
+                        CACHE_LOOKUPS.labels(self.name, 'hit').inc()
+                        return value
+                    if age < entry_ttl + stale_ttl:
+                        CACHE_LOOKUPS.labels(self.name, 'stale').inc()
+                        if key not in self._loading:
+                            self._loading[key] = threading.Event()
+                            threading.Thread(
+                                target=self._refresh, args=(key, loader, ttl), daemon=True
+                            ).start()
+                        return value
+
+                pending = self._loading.get(key)
+                if pending is None and (entry is not None or adopted):
+                    CACHE_LOOKUPS.labels(self.name, 'miss').inc()
+                    self._loading[key] = threading.Event()
+                    break
+
+            if pending is None:
+                # First use in this process: take over what other workers stored, even if stale
+                adopted = True
+                shared = self.backend.get(self._shared_key(key))
+                if shared is not None:
+                    self._store(key, *shared)
+                continue
+
+            # Another thread is already loading this key; wait for it and re-check
+            pending.wait()
+
+        try:
+            return self._load(key, loader, ttl)
+        finally:
+            self._finish_loading(key)
+
+    def peek(self, key):
+        """Return the cached value for key regardless of age, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, resetting its age."""
+        ttl = self.ttl if ttl is None else ttl
+        fetched_at = time.time()
+        self._store(key, value, fetched_at, ttl)
+        if self.backend is not None:
+            self.backend.set(self._shared_key(key), value, fetched_at, ttl, ttl + self.stale_ttl)
+
+    def seed(self, key, value, fetched_at):
+        """Store a value restored from a snapshot taken at fetched_at; it is served, however old, until reloaded."""
+        self._store(key, value, fetched_at, self.ttl, stale_ttl=float('inf'))
+
+    def items(self):
+        """Return (key, value, fetched_at) for every entry held in this process."""
+        with self._lock:
+            return [(key, entry[0], entry[1]) for key, entry in self._entries.items()]
+
+    def invalidate(self, key):
+        """Drop key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.backend is not None:
+            self.backend.delete(self._shared_key(key))
+
+    def _shared_key(self, key):
+        return f"{self.name}:{key}"
+
+    def _store(self, key, value, fetched_at, ttl, stale_ttl=None):
+        with self._lock:
+            self._entries[key] = (value, fetched_at, ttl, self.stale_ttl if stale_ttl is None else stale_ttl)
+
+    def _load(self, key, loader, ttl):
+        """Return a fresh value for key, taken from another process's load when there is one."""
+        if self.backend is None:
+            return self._call(key, loader, ttl)
+
+        shared_key = self._shared_key(key)
+        deadline = time.time() + SHARED_LOAD_TIMEOUT
+        token = None
+        try:
+            while True:
+                shared = self.backend.get(shared_key)
+                if shared is not None and time.time() - shared[1] < shared[2]:
+                    self._store(key, *shared)
+                    return shared[0]
+                if token is not None:
+                    break  # Still missing after taking the load lock; load it here
+                token = self.backend.acquire(shared_key, SHARED_LOAD_TIMEOUT)
+                if token is None:
+                    if time.time() >= deadline:
+                        break
+                    time.sleep(SHARED_LOAD_POLL)  # Another process is loading this key
+
+            return self._call(key, loader, ttl)
+        finally:
+            if token is not None:
+                self.backend.release(shared_key, token)
+
+    def _call(self, key, loader, ttl):
+        value = loader()
+        if isinstance(value, Uncached):
+            return value.value
+        self.set(key, value, ttl)
+        return value
+
+    def _refresh(self, key, loader, ttl):
+        try:
+            self._load(key, loader, ttl)
+        except Exception as e:
+            # Keep serving the stale value; the next expired read retries the refresh
+            logger.warning("Background refresh failed for %r: %s", key, e, extra={'cache': self.name})
+        finally:
+            self._finish_loading(key)
+
+    def _finish_loading(self, key):
+        with self._lock:
+            event = self._loading.pop(key, None)
+        if event is not None:
+            event.set()
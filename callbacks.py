@@ -1,63 +1,53 @@
 # callbacks.py
+import logging
 import dash
-import json
 from dash.dependencies import Input, Output, State
 from dash import html
-import dash_bootstrap_components as dbc
-from datetime import datetime, timezone
-import requests
-from utils import save_last_fetched_odds, load_last_fetched_odds, extract_game_info
-
-last_fetched_odds = load_last_fetched_odds()
+from poller import scoreboard_poller, game_is_final
+import upstream
+from refresh_schedule import game_state, client_interval_ms
+from game_cards import LIVE_KEYS, LIVE_COMPONENTS, cached_game_card, render_live_component
+from utils import (odds_store, extract_game_info, fetch_week_odds, get_week_index,
+                   fetch_scoring_plays, format_scoring_plays)
+
+logger = logging.getLogger(__name__)
+
+# Interval traces fire every few seconds per open session; keep one in this many
+INTERVAL_LOG_SAMPLE = 100
+
+# Shown in stale-note while upstream data may be out of date, by upstream.stale_reason()
+UNAVAILABLE_NOTE = "The live data provider is not responding; showing the last scores and odds received."
+STALE_NOTES = {
+    'quota': "Updates are limited to stay within the API budget; some scores and odds may be out of date.",
+    'circuit': UNAVAILABLE_NOTE,
+    'error': UNAVAILABLE_NOTE,
+}
 
 def register_callbacks(app):
     @app.callback(
         Output('week-selector', 'options'),
         Output('week-options-store', 'data'),
         Output('week-selector', 'value'),
-        Output('nfl-events-data', 'data'),
+        Output('season-version', 'data'),
         [Input('week-options-store', 'data')]
     )
     def update_week_options(week_options_fetched):
-        print("update_week_options triggered")
-        week_options = []  # Initialize week_options here
+        logger.debug("update_week_options triggered")
 
-        if week_options_fetched or week_options:  # Check if already fetched or if week_options is not empty
+        if week_options_fetched:  # Check if already fetched
             raise dash.exceptions.PreventUpdate
 
-        # Fetch NFL events once and store them
-        response = requests.get("http://127.0.0.1:8001/nfl-events")  # Updated port to 8001
-        data = response.json() if response.status_code == 200 else {}
-        leagues_data = data.get('leagues', [])
-
-        if not leagues_data:
-            return [], False, None, {}
-
-        nfl_league = leagues_data[0]
-        calendar_data = nfl_league.get('calendar', [])
-        week_options = []
-        selected_value = None
-        current_date = datetime.now(timezone.utc)
-
-        week_counter = 0
-        for period in calendar_data:
-            if 'entries' in period:
-                for week in period['entries']:
-                    start_date = datetime.fromisoformat(week['startDate'][:-1]).replace(tzinfo=timezone.utc)
-                    end_date = datetime.fromisoformat(week['endDate'][:-1]).replace(tzinfo=timezone.utc)
-                    week_label = f"{week['label']}: {start_date.strftime('%m/%d')} - {end_date.strftime('%m/%d')}"
-
-                    week_options.append({'label': week_label, 'value': week_counter})
+        week_index = get_week_index()
+        if not week_index:
+            return [], False, None, None
 
-                    if start_date <= current_date <= end_date:
-                        selected_value = week_counter
-
-                    week_counter += 1
-
-        if selected_value is None and week_options:
+        week_options = week_index.options
+        selected_value = week_index.current_week()
+        if selected_value is None:
             selected_value = week_options[0]['value']
 
-        return week_options, True, selected_value, data  # Return the fetched data to store it
+        # The browser keeps only week numbers and the calendar version; games are resolved server-side
+        return week_options, True, selected_value, week_index.version
 
 
     @app.callback(
@@ -65,305 +55,156 @@ def register_callbacks(app):
         [Input('week-options-store', 'data')]
     )
     def store_selected_week(week_options_fetched):
-        print("store_selected_week triggered")
+        logger.debug("store_selected_week triggered")
         if not week_options_fetched:
             raise dash.exceptions.PreventUpdate
 
-        data = requests.get("http://127.0.0.1:8001/nfl-events").json()  # Updated port to 8001
-        leagues_data = data.get('leagues', [])
-
-        selected_value = None
-        if leagues_data:
-            nfl_league = leagues_data[0]
-            calendar_data = nfl_league.get('calendar', [])
-            current_date = datetime.now(timezone.utc)
-
-            week_counter = 0
-            for i, period in enumerate(calendar_data):
-                if 'entries' in period:
-                    for week in period['entries']:
-                        start_date = datetime.fromisoformat(week['startDate'][:-1]).replace(tzinfo=timezone.utc)
-                        end_date = datetime.fromisoformat(week['endDate'][:-1]).replace(tzinfo=timezone.utc)
-
-                        if start_date <= current_date <= end_date:
-                            selected_value = week_counter
-                            break
-
-                        week_counter += 1
-
-        return {'value': selected_value}
+        week_index = get_week_index()
+        return {'value': week_index.current_week() if week_index else None}
 
 
     @app.callback(
         Output('game-info', 'children'),
         Output('in-progress-flag', 'data'),
-        [Input('week-selector', 'value'),
-         Input('scores-data', 'data')],
-        [State('nfl-events-data', 'data')],
+        Output('scores-version', 'data', allow_duplicate=True),
+        Output('week-options-store', 'data', allow_duplicate=True),
+        Output('stale-reason', 'data', allow_duplicate=True),
+        [Input('week-selector', 'value')],
+        [State('season-version', 'data')],
         prevent_initial_call=True
     )
-    def display_game_info(selected_week_index, scores_data, nfl_events_data):
-        print("display_game_info triggered")
-        print(f"Scores Data: {scores_data}")
-
-        ctx = dash.callback_context
-        triggered_by_week_selection = any(
-            'week-selector' in trigger['prop_id'] for trigger in ctx.triggered
-        )
-
-        if triggered_by_week_selection:
-            print("Week selection triggered, fetching NFL events.")
-            nfl_events_data = requests.get("http://127.0.0.1:8001/nfl-events").json()  # Updated port to 8001
-
-        if scores_data:
-            for game in scores_data:
-                print(f"Game: {game.get('Home Team')} vs {game.get('Away Team')}")
-                print(f"Scores: {game.get('Home Team Score')} - {game.get('Away Team Score')}")
-                print(f"Down and Distance: {game.get('Down Distance')}")
-                print(f"Possession: {game.get('Possession')}")
-
-        if not nfl_events_data:
-            return html.P("No NFL events data available."), False
-
-        leagues_data = nfl_events_data.get('leagues', [])
-        if not leagues_data:
-            return html.P("No leagues data available."), False
-
-        nfl_league = leagues_data[0]
-        calendar_data = nfl_league.get('calendar', [])
-        week_data = None
-        week_counter = 0
-
-        for period in calendar_data:
-            if 'entries' in period:
-                for week in period['entries']:
-                    if week_counter == selected_week_index:
-                        week_data = week
-                        break
-                    week_counter += 1
-            if week_data:
-                break
-
-        if not week_data:
-            return html.P("Selected week data not found."), False
-
-        week_start = datetime.fromisoformat(week_data['startDate'][:-1]).replace(tzinfo=timezone.utc)
-        week_end = datetime.fromisoformat(week_data['endDate'][:-1]).replace(tzinfo=timezone.utc)
-
-        events_data = nfl_events_data.get('events', [])
-        selected_week_games = [
-            event for event in events_data
-            if week_start <= datetime.fromisoformat(event['date'][:-1]).replace(tzinfo=timezone.utc) <= week_end
-        ]
-        games_in_progress = any(game['status']['type']['description'] != 'Scheduled' or
-                                game['status']['type']['description'] != 'Final'
-                                for game in selected_week_games)
+    def display_game_info(selected_week_index, season_version):
+        logger.debug("display_game_info triggered", extra={'week': selected_week_index})
+
+        # Week boundaries and per-week games are precomputed once per season feed refresh
+        week_index = get_week_index()
+        stale_reason = upstream.stale_reason()
+        if week_index is None:
+            return html.P("No NFL events data available."), False, dash.no_update, dash.no_update, stale_reason
+
+        if not week_index:
+            return html.P("No leagues data available."), False, dash.no_update, dash.no_update, stale_reason
+
+        if season_version != week_index.version:
+            # The selector's week numbers refer to an older calendar; reload the options, which
+            # reselects the current week and brings this callback back with the new version
+            return dash.no_update, dash.no_update, dash.no_update, False, dash.no_update
+
+        selected_week_games = week_index.events_for_week(selected_week_index)
+        if selected_week_games is None:
+            return html.P("Selected week data not found."), False, dash.no_update, dash.no_update, stale_reason
+
+        games_in_progress = any(game_state(game) == 'in' for game in selected_week_games)
 
         sorted_games = sorted(selected_week_games, key=lambda x: (
             x['status']['type']['description'] == 'Final',
             x['status']['type']['description'] == 'Scheduled',
         ))
 
+        # Resolve the whole week's odds in one concurrent batch before formatting any game
+        week_odds = fetch_week_odds(sorted_games, odds_store)
+
+        # The season feed is cached; overlay the poller's fresher live state onto each card
+        snapshot = scoreboard_poller.snapshot()
+
         games_info = []
         for game in sorted_games:
-            game_info = extract_game_info(game, last_fetched_odds)
             game_id = game.get('id')
-            home_color = game_info['Home Team Color']
-            away_color = game_info['Away Team Color']
-
-            possession_team = None
-            down_distance = None
-            if 'situation' in game['competitions'][0]:
-                possession_team_id = game['competitions'][0]['situation'].get('possession', None)
-                down_distance = game['competitions'][0]['situation'].get('downDistanceText', '')
-
-                if possession_team_id:
-                    if possession_team_id == game['competitions'][0]['competitors'][0]['team']['id']:
-                        possession_team = game['competitions'][0]['competitors'][0]['team']['displayName']
-                    elif possession_team_id == game['competitions'][0]['competitors'][1]['team']['id']:
-                        possession_team = game['competitions'][0]['competitors'][1]['team']['displayName']
-
-            home_team_extra_info = []
-            away_team_extra_info = []
-
-            if possession_team and possession_team != "N/A":
-                if possession_team == game_info['Home Team']:
-                    home_team_extra_info = [html.H6(["🏈 ", down_distance])]
-                elif possession_team == game_info['Away Team']:
-                    away_team_extra_info = [html.H6(["🏈 ", down_distance])]
-            else:
-                home_team_extra_info = []
-                away_team_extra_info = []
-
-            home_team_score_display = [html.H4(game_info['Home Team Score'])]
-            away_team_score_display = [html.H4(game_info['Away Team Score'])]
-
-            games_info.append(
-                dbc.Button(
-                    dbc.Row([
-                        dbc.Col(html.Img(src=game_info['Home Team Logo'], height="60px"), width=1,
-                                style={'textAlign': 'center'}),
-                        dbc.Col(
-                            html.Div([
-                                html.H4(game_info['Home Team'], style={'color': game_info['Home Team Color']}),
-                                html.P(f"{game_info['Home Team Record']}", style={'margin': '0', 'padding': '0'}),
-                                html.Div(home_team_score_display),
-                                html.P(home_team_extra_info)
-                            ], style={'textAlign': 'center'}),
-                            width=3
-                        ),
-                        dbc.Col(
-                            html.Div([
-                                html.H5(game_info['Game Status']),
-                                (html.H6(f"{game_info['Quarter']} Qtr, {game_info['Time Remaining']} remaining")
-                                 if game_info['Game Status'] == 'In Progress' else ""),
-                                html.H6(game_info['Odds']) if game_info['Odds'] else "",
-                                html.P(game_info['Start Date (EST)'], style={'margin': '0', 'padding': '0'}),
-                                html.P(f"{game_info['Location']} - {game_info['Network']}",
-                                       style={'margin': '0', 'padding': '0'}),
-                            ], style={'textAlign': 'center'}),
-                            width=4
-                        ),
-                        dbc.Col(
-                            html.Div([
-                                html.H4(game_info['Away Team'], style={'color': game_info['Away Team Color']}),
-                                html.P(f"{game_info['Away Team Record']}", style={'margin': '0', 'padding': '0'}),
-                                html.Div(away_team_score_display),
-                                html.P(away_team_extra_info)
-                            ], style={'textAlign': 'center'}),
-                            width=3
-                        ),
-                        dbc.Col(html.Img(src=game_info['Away Team Logo'], height="60px"), width=1,
-                                style={'textAlign': 'center'}),
-                    ], className="game-row", style={'padding': '10px'}),
-                    id={'type': 'game-button', 'index': game_id},
-                    n_clicks=0,
-                    color='light',
-                    className='dash-bootstrap',
-                    style={
-                        '--team-home-color': home_color + '50',
-                        '--team-away-color': away_color + '50',
-                        'width': '100%',
-                        'textAlign': 'left'
-                    },
-                    value=game_id,
-                )
-            )
-            games_info.append(html.Div(id={'type': 'scoring-plays', 'index': game_id}, children=[]))
-            games_info.append(html.Hr())
-
-        return games_info, games_in_progress
+            game_info = extract_game_info(game, week_odds.get(game_id))
+            live_scores = snapshot['games'].get(game_id)
+            if live_scores:
+                game_info.update({key: live_scores[key] for key in LIVE_KEYS})
+            games_info.extend(cached_game_card(game_id, game_info))
+
+        return games_info, games_in_progress, snapshot['version'], dash.no_update, stale_reason
 
 
     @app.callback(
-        Output('scores-data', 'data'),
+        *[Output({'type': component_type, 'index': dash.dependencies.ALL}, 'children')
+          for component_type in LIVE_COMPONENTS],
         Output('in-progress-flag', 'data', allow_duplicate=True),
+        Output('scores-version', 'data'),
+        Output('interval-scores', 'interval'),
+        Output('stale-reason', 'data'),
         [Input('interval-scores', 'n_intervals')],
-        [State('scores-data', 'data')],
+        [State('scores-version', 'data'),
+         State('interval-scores', 'interval'),
+         State('stale-reason', 'data')],
         prevent_initial_call=True
     )
-    def update_scores(n_intervals, prev_scores_data):
-        print(f"Interval triggered: {n_intervals}")
-        response = requests.get("http://127.0.0.1:8001/nfl-scoreboard-day")  # Updated port to 8001
-        games_data = response.json() if response.status_code == 200 else {}
-
-        if not games_data:
-            print("No games data found.")
-            return dash.no_update, False
-
-        updated_scores_data = []
-        games_in_progress = False
-
-        for game in games_data.get('events', []):
-            game_id = game.get('id')
-            competitions = game.get('competitions', [])
-
-            if not competitions:
-                print(f"No competitions found for game ID {game_id}")
-                continue
-
-            home_team = competitions[0]['competitors'][0]['team']['displayName']
-            away_team = competitions[0]['competitors'][1]['team']['displayName']
-            home_score = competitions[0]['competitors'][0].get('score', 'N/A')
-            away_score = competitions[0]['competitors'][1].get('score', 'N/A')
-
-            status_info = competitions[0].get('status', {})
-            quarter = status_info.get('period', 'N/A')
-            time_remaining = status_info.get('displayClock', 'N/A')
-            game_status = status_info.get('type', {}).get('description', 'N/A')
-
-            situation = competitions[0].get('situation', {})
-            possession = situation.get('downDistanceText', 'N/A')
-            possession_team = situation.get('possessionText', 'N/A')
-
-            print(f"{home_team} vs {away_team}: {quarter} quarter, {time_remaining}")
-            print(f"Score: {home_team} {home_score} - {away_team} {away_score}")
-            print(f"Current Possession: {possession_team} - {possession}")
+    def update_scores(n_intervals, seen_version, current_interval, seen_stale_reason):
+        logger.debug("update_scores triggered", extra={'n_intervals': n_intervals, 'sample': INTERVAL_LOG_SAMPLE})
+        # One process polls the scoreboard and every worker adopts its snapshot; sessions read that
+        snapshot = scoreboard_poller.snapshot()
+        changed_games = scoreboard_poller.changes_since(seen_version)
+
+        # Follow the server's adaptive schedule so idle days cost no client polls either
+        interval = client_interval_ms(scoreboard_poller.next_poll_at, snapshot['in_progress'], get_week_index())
+        if interval == current_interval:
+            interval = dash.no_update
+
+        # Scores freeze during an outage, so the note must follow upstream rather than new versions
+        stale_reason = upstream.stale_reason()
+        if stale_reason == seen_stale_reason:
+            stale_reason = dash.no_update
+
+        # Patch only the live components of games that changed since this session's version
+        patches = []
+        for output_specs in dash.callback_context.outputs_list[:len(LIVE_COMPONENTS)]:
+            component_patches = []
+            for spec in output_specs:
+                game_id = spec['id']['index']
+                live_scores = snapshot['games'].get(game_id)
+                if live_scores and (changed_games is None or game_id in changed_games):
+                    component_patches.append(render_live_component(spec['id']['type'], live_scores))
+                else:
+                    component_patches.append(dash.no_update)
+            patches.append(component_patches)
+
+        if snapshot['version'] == seen_version:
+            return *patches, dash.no_update, dash.no_update, interval, stale_reason
+
+        logger.debug("Scores updated to version %d", snapshot['version'],
+                     extra={'seen_version': seen_version, 'sample': INTERVAL_LOG_SAMPLE})
+        return *patches, snapshot['in_progress'], snapshot['version'], interval, stale_reason
 
-            if game_status.lower() == "in progress":
-                games_in_progress = True
 
-            updated_scores_data.append({
-                'game_id': game_id,
-                'Home Team': home_team,
-                'Away Team': away_team,
-                'Home Team Score': home_score,
-                'Away Team Score': away_score,
-                'Quarter': quarter,
-                'Time Remaining': time_remaining,
-                'Down Distance': possession,
-                'Possession': possession_team,
-            })
+    @app.callback(
+        Output('stale-note', 'children'),
+        [Input('stale-reason', 'data')],
+        prevent_initial_call=True
+    )
+    def show_stale_note(stale_reason):
+        # Written by the week view, update_scores and the live score stream
+        if not stale_reason:
+            return []
+        return html.P(STALE_NOTES[stale_reason], className="text-muted text-center")
 
-        if prev_scores_data == updated_scores_data:
-            print("No updates needed.")
-            return dash.no_update, games_in_progress
 
-        print("Scores updated.")
-        return updated_scores_data, games_in_progress
+    @app.callback(
+        Output('interval-scores', 'interval', allow_duplicate=True),
+        [Input('in-progress-flag', 'data')],
+        [State('interval-scores', 'interval')],
+        prevent_initial_call=True
+    )
+    def follow_live_games(games_in_progress, current_interval):
+        # Switch to live polling as soon as the selected week shows a game in progress
+        interval = client_interval_ms(scoreboard_poller.next_poll_at, games_in_progress, get_week_index())
+        return interval if interval != current_interval else dash.no_update
 
 
     @app.callback(
-        Output({'type': 'scoring-plays', 'index': dash.dependencies.ALL}, 'children'),
-        [Input({'type': 'game-button', 'index': dash.dependencies.ALL}, 'n_clicks')],
-        [State({'type': 'game-button', 'index': dash.dependencies.ALL}, 'id')]
+        Output({'type': 'scoring-plays', 'index': dash.dependencies.MATCH}, 'children'),
+        [Input({'type': 'game-button', 'index': dash.dependencies.MATCH}, 'n_clicks')],
+        [State({'type': 'game-button', 'index': dash.dependencies.MATCH}, 'id')],
+        prevent_initial_call=True
     )
-    def display_scoring_plays(n_clicks_list, button_ids):
-        print("display_scoring_plays triggered")
-
-        ctx = dash.callback_context
-        if not ctx.triggered:
-            return [[]] * len(n_clicks_list)
-
-        triggered_button = ctx.triggered[0]['prop_id'].split('.')[0]
-        game_id = json.loads(triggered_button)['index']
-
-        response = requests.get(f"http://127.0.0.1:8001/nfl-scoringplays?game_id={game_id}")  # Updated port to 8001
-        scoring_plays = response.json() if response.status_code == 200 else []
-
-        outputs = []
-        for i, button_id in enumerate(button_ids):
-            if n_clicks_list[i] % 2 == 1:
-                formatted_scoring_plays = []
-                for play in scoring_plays:
-                    team_logo = play['team'].get('logo', '')
-                    period = play.get('period', {}).get('number', '')
-                    clock = play.get('clock', {}).get('displayValue', '')
-                    text = play.get('text', '')
-                    away_score = play.get('awayScore', 'N/A')
-                    home_score = play.get('homeScore', 'N/A')
-
-                    formatted_play = html.Div([
-                        html.Img(src=team_logo, height="30px", style={'margin-right': '10px'}),
-                        html.Span(f"Q{period} {clock} - "),
-                        html.Span(text),
-                        html.Span(f" ({away_score} - {home_score})", style={'margin-left': '10px'})
-                    ], style={'display': 'flex', 'align-items': 'center'})
-
-                    formatted_scoring_plays.append(formatted_play)
-
-                outputs.append(formatted_scoring_plays)
-            else:
-                outputs.append([])
-
-        return outputs
\ No newline at end of file
+    def display_scoring_plays(n_clicks, button_id):
+        logger.debug("display_scoring_plays triggered", extra={'button': button_id})
+
+        if n_clicks % 2 == 0:
+            return []
+
+        # Final games are cached permanently, so re-expanding them costs no upstream call
+        game_id = button_id['index']
+        return format_scoring_plays(fetch_scoring_plays(game_id, final=game_is_final(game_id)) or [])
@@ -5,9 +5,7 @@ from dash.dependencies import Input, Output, State
 from dash import html
 import dash_bootstrap_components as dbc
 from datetime import datetime, timezone
-from utils import fetch_nfl_events, fetch_games_by_day, save_last_fetched_odds, load_last_fetched_odds, extract_game_info, get_scoring_plays
-
-last_fetched_odds = load_last_fetched_odds()
+from utils import fetch_nfl_events, fetch_games_by_day, odds_store, fetch_espn_bet_odds, extract_game_info, get_scoring_plays
 
 def register_callbacks(app):
     @app.callback(
@@ -177,7 +175,7 @@ def register_callbacks(app):
 
         games_info = []
         for game in sorted_games:
-            game_info = extract_game_info(game, last_fetched_odds)
+            game_info = extract_game_info(game, fetch_espn_bet_odds(game.get('id'), game['status']['type']['description'], odds_store))
             game_id = game.get('id')
             home_color = game_info['Home Team Color']
             away_color = game_info['Away Team Color']
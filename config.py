@@ -5,13 +5,99 @@ from dotenv import load_dotenv
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
-NFL_EVENTS_URL = "https://nfl-api-data.p.rapidapi.com/nfl-events"
-ODDS_URL = "https://nfl-api-data.p.rapidapi.com/nfl-eventodds"
-SCORING_PLAYS_URL = "https://nfl-api-data.p.rapidapi.com/nfl-scoringplays"
-SCOREBOARD_URL = "https://nfl-api-data.p.rapidapi.com/nfl-scoreboard-day"
+
+# Upstream mode: 'live' calls RapidAPI, 'record' also appends every response to RECORDING_PATH,
+# and 'replay' points the upstream URLs at the local replay server (python replay.py)
+UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "live")
+RECORDING_PATH = os.getenv("RECORDING_PATH", 'recordings/upstream.jsonl')
+REPLAY_PORT = int(os.getenv("REPLAY_PORT", 8002))
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", 1))  # 1 = real time, 60 = a minute of the recording per second
+REPLAY_LATENCY = os.getenv("REPLAY_LATENCY", "1") == "1"  # Reproduce recorded response times
+
+if UPSTREAM_MODE == "replay":
+    UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL", f"http://127.0.0.1:{REPLAY_PORT}")
+else:
+    UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL", "https://nfl-api-data.p.rapidapi.com")
+NFL_EVENTS_URL = f"{UPSTREAM_BASE_URL}/nfl-events"
+ODDS_URL = f"{UPSTREAM_BASE_URL}/nfl-eventodds"
+SCORING_PLAYS_URL = f"{UPSTREAM_BASE_URL}/nfl-scoringplays"
+SCOREBOARD_URL = f"{UPSTREAM_BASE_URL}/nfl-scoreboard-day"
 HEADERS = {
     "x-rapidapi-key": API_KEY,
     "x-rapidapi-host": "nfl-api-data.p.rapidapi.com"
 }
-ODDS_FILE_PATH = 'last_fetched_odds.json'
+# Per-endpoint (connect, read) timeouts in seconds; the season feed is several hundred KB
+UPSTREAM_TIMEOUTS = {
+    NFL_EVENTS_URL: (3.05, 20),
+    ODDS_URL: (3.05, 5),
+    SCORING_PLAYS_URL: (3.05, 5),
+    SCOREBOARD_URL: (3.05, 5),
+}
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", 20))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", 2))
+UPSTREAM_BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", 0.5))  # Base delay for jittered exponential backoff
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", 5))
+# Seconds to wait for a response before sending a duplicate (hedged) request; 0 disables
+# hedging, as for the season feed whose normal transfer time would trigger it
+UPSTREAM_HEDGE_AFTER = {
+    NFL_EVENTS_URL: 0,
+    ODDS_URL: 1.5,
+    SCORING_PLAYS_URL: 1.5,
+    SCOREBOARD_URL: 1,
+}
+# Per-endpoint circuit breaker (see breaker.py): opens when at least BREAKER_FAILURE_RATE of
+# the requests in the last BREAKER_WINDOW seconds failed, then probes after BREAKER_COOLDOWN
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", 0.5))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", 5))
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", 60))
+BREAKER_COOLDOWN = int(os.getenv("BREAKER_COOLDOWN", 15))
+# RapidAPI request budget (see quota.py); 0 means unlimited
+QUOTA_DAILY_BUDGET = int(os.getenv("QUOTA_DAILY_BUDGET", 0))
+QUOTA_MONTHLY_BUDGET = int(os.getenv("QUOTA_MONTHLY_BUDGET", 0))
+QUOTA_BURST = int(os.getenv("QUOTA_BURST", 0))  # Most requests banked for a busy day; defaults to a day's budget
+# Share of the quota each endpoint may not use, so lower priorities stop first as it runs low:
+# live scoreboard, then the season feed, then scoring plays, then odds
+UPSTREAM_QUOTA_RESERVES = {
+    SCOREBOARD_URL: 0,
+    NFL_EVENTS_URL: 0.1,
+    SCORING_PLAYS_URL: 0.25,
+    ODDS_URL: 0.5,
+}
+ODDS_FILE_PATH = 'last_fetched_odds.json'  # Legacy odds snapshot, used to seed the odds log on first start
+ODDS_LOG_PATH = os.getenv("ODDS_LOG_PATH", 'last_fetched_odds.jsonl')
+ODDS_MAX_WORKERS = int(os.getenv("ODDS_MAX_WORKERS", 8))  # Concurrent odds requests when rendering a week
+NFL_SEASON = os.getenv("NFL_SEASON", "2024")
+# Season feed cache: fresh for EVENTS_CACHE_TTL seconds, then served stale for up to
+# EVENTS_CACHE_STALE_TTL more seconds while it is refreshed in the background
+EVENTS_CACHE_TTL = int(os.getenv("EVENTS_CACHE_TTL", 300))
+EVENTS_CACHE_STALE_TTL = int(os.getenv("EVENTS_CACHE_STALE_TTL", 3600))
+SCORING_PLAYS_LIVE_TTL = int(os.getenv("SCORING_PLAYS_LIVE_TTL", 30))  # Cache lifetime for games not yet final
+# Adaptive scoreboard refresh schedule, in seconds (see refresh_schedule.py)
+LIVE_POLL_INTERVAL = int(os.getenv("LIVE_POLL_INTERVAL", 15))  # While any game is live
+PREGAME_POLL_INTERVAL = int(os.getenv("PREGAME_POLL_INTERVAL", 5 * 60))  # Once a kickoff is within PREGAME_WINDOW
+PREGAME_WINDOW = int(os.getenv("PREGAME_WINDOW", 3 * 60 * 60))
+IDLE_POLL_INTERVAL = int(os.getenv("IDLE_POLL_INTERVAL", 6 * 60 * 60))  # Longest sleep when no game is near
+KICKOFF_LEAD = 60  # Land the last pre-game poll this long before kickoff
+MAX_GAME_LENGTH = 5 * 60 * 60  # Treat unfinished games that kicked off this recently as live
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG adds per-game score dumps and callback traces
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Records buffered for the log writer before dropping
+# Cache shared by the worker processes (see shared_cache.py): 'sqlite' shares one file between the
+# workers on a host, 'redis' shares CACHE_REDIS_URL between instances (needs the redis package),
+# and 'memory' keeps each worker's cache to itself
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", 'cache.sqlite3')
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Shared scoreboard lifetime; just under the live poll interval so direct reads share the poller's fetch
+SCOREBOARD_CACHE_TTL = int(os.getenv("SCOREBOARD_CACHE_TTL", LIVE_POLL_INTERVAL - 1))
+CARD_CACHE_SIZE = int(os.getenv("CARD_CACHE_SIZE", 1024))  # Rendered game cards kept for reuse
+REPRESENTATIONS_SIZE = int(os.getenv("REPRESENTATIONS_SIZE", 1024))  # Encoded API responses kept for ETags
+ODDS_CACHE_TTL = int(os.getenv("ODDS_CACHE_TTL", 10 * 60))  # How long pre-game odds are reused before refetching
+# Team logo thumbnails (see logos.py): the pixel sizes the cards and scoring plays use
+LOGO_DIR = os.getenv("LOGO_DIR", 'logo_cache')
+LOGO_SIZES = (30, 60)
+# Warm-start snapshots (see warmup.py); set SNAPSHOT_DIR to '' to disable
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", 'snapshot')
+SNAPSHOT_INTERVAL = int(os.getenv("SNAPSHOT_INTERVAL", 5 * 60))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # Smallest Dash response worth gzipping, in bytes
+STREAM_HEARTBEAT = 15  # Seconds between keep-alive comments on idle live score streams
 PORT = int(os.environ.get('PORT', 8080))
\ No newline at end of file
@@ -0,0 +1,142 @@
+# game_cards.py
+import threading
+from collections import OrderedDict
+from dash import html
+from dash.development.base_component import Component
+import dash_bootstrap_components as dbc
+from config import CARD_CACHE_SIZE
+from metrics import CACHE_LOOKUPS
+
+# Game fields that change during play. Each has its own pattern-matching component per
+# game, so score updates can patch just those components instead of the whole card.
+LIVE_KEYS = ('Home Team Score', 'Away Team Score', 'Game Status', 'Quarter', 'Time Remaining',
+             'Down Distance', 'Possession Side')
+LIVE_COMPONENTS = ('home-score', 'away-score', 'game-status', 'home-possession', 'away-possession')
+
+# Rendered cards as JSON-ready dicts, keyed by (game ID, game info items), least recently used first
+_card_cache = OrderedDict()
+_card_cache_lock = threading.Lock()
+
+
+def render_score(score):
+    return [html.H4(score)]
+
+
+def render_status(game_info):
+    return [
+        html.H5(game_info['Game Status']),
+        (html.H6(f"{game_info['Quarter']} Qtr, {game_info['Time Remaining']} remaining")
+         if game_info['Game Status'] == 'In Progress' else ""),
+    ]
+
+
+def render_possession(game_info, side):
+    if game_info.get('Possession Side') == side:
+        return [html.H6(["🏈 ", game_info['Down Distance']])]
+    return []
+
+
+def render_live_component(component_type, game_info):
+    """Render the children of one live component type for a game."""
+    if component_type == 'home-score':
+        return render_score(game_info['Home Team Score'])
+    if component_type == 'away-score':
+        return render_score(game_info['Away Team Score'])
+    if component_type == 'game-status':
+        return render_status(game_info)
+    if component_type == 'home-possession':
+        return render_possession(game_info, 'home')
+    return render_possession(game_info, 'away')
+
+
+def build_game_card(game_id, game_info):
+    """Build the full card for a game: the game button, its scoring-plays panel and a divider."""
+    home_color = game_info['Home Team Color']
+    away_color = game_info['Away Team Color']
+
+    return [
+        dbc.Button(
+            dbc.Row([
+                dbc.Col(html.Img(src=game_info['Home Team Logo'], height="60px"), width=1,
+                        style={'textAlign': 'center'}),
+                dbc.Col(
+                    html.Div([
+                        html.H4(game_info['Home Team'], style={'color': game_info['Home Team Color']}),
+                        html.P(f"{game_info['Home Team Record']}", style={'margin': '0', 'padding': '0'}),
+                        html.Div(render_live_component('home-score', game_info),
+                                 id={'type': 'home-score', 'index': game_id}),
+                        html.P(render_live_component('home-possession', game_info),
+                               id={'type': 'home-possession', 'index': game_id})
+                    ], style={'textAlign': 'center'}),
+                    width=3
+                ),
+                dbc.Col(
+                    html.Div([
+                        html.Div(render_live_component('game-status', game_info),
+                                 id={'type': 'game-status', 'index': game_id}),
+                        html.H6(game_info['Odds']) if game_info['Odds'] else "",
+                        html.P(game_info['Start Date (EST)'], style={'margin': '0', 'padding': '0'}),
+                        html.P(f"{game_info['Location']} - {game_info['Network']}",
+                               style={'margin': '0', 'padding': '0'}),
+                    ], style={'textAlign': 'center'}),
+                    width=4
+                ),
+                dbc.Col(
+                    html.Div([
+                        html.H4(game_info['Away Team'], style={'color': game_info['Away Team Color']}),
+                        html.P(f"{game_info['Away Team Record']}", style={'margin': '0', 'padding': '0'}),
+                        html.Div(render_live_component('away-score', game_info),
+                                 id={'type': 'away-score', 'index': game_id}),
+                        html.P(render_live_component('away-possession', game_info),
+                               id={'type': 'away-possession', 'index': game_id})
+                    ], style={'textAlign': 'center'}),
+                    width=3
+                ),
+                dbc.Col(html.Img(src=game_info['Away Team Logo'], height="60px"), width=1,
+                        style={'textAlign': 'center'}),
+            ], className="game-row", style={'padding': '10px'}),
+            id={'type': 'game-button', 'index': game_id},
+            n_clicks=0,
+            color='light',
+            className='dash-bootstrap',
+            style={
+                '--team-home-color': home_color + '50',
+                '--team-away-color': away_color + '50',
+                'width': '100%',
+                'textAlign': 'left'
+            },
+            value=game_id,
+        ),
+        html.Div(id={'type': 'scoring-plays', 'index': game_id}, children=[]),
+        html.Hr(),
+    ]
+
+
+def _to_plain(value):
+    """Convert a component tree to the nested dicts Dash serializes it as."""
+    if isinstance(value, Component):
+        plain = value.to_plotly_json()
+        plain['props'] = {name: _to_plain(prop) for name, prop in plain['props'].items()}
+        return plain
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    return value
+
+
+def cached_game_card(game_id, game_info):
+    """Return build_game_card(game_id, game_info), reusing the card rendered for the same game state."""
+    key = (game_id, tuple(sorted(game_info.items())))
+    with _card_cache_lock:
+        card = _card_cache.get(key)
+        if card is not None:
+            _card_cache.move_to_end(key)
+            CACHE_LOOKUPS.labels('game_cards', 'hit').inc()
+            return card
+
+    CACHE_LOOKUPS.labels('game_cards', 'miss').inc()
+    card = _to_plain(build_game_card(game_id, game_info))
+    with _card_cache_lock:
+        _card_cache[key] = card
+        if len(_card_cache) > CARD_CACHE_SIZE:
+            _card_cache.popitem(last=False)
+    return card
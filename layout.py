@@ -2,6 +2,7 @@
 from dash import dcc
 from dash import html
 import dash_bootstrap_components as dbc
+from static_assets import asset_url
 
 layout = dbc.Container([
     dcc.Interval(id='interval-scores', interval=30 * 1000, n_intervals=0),
@@ -9,13 +10,14 @@ layout = dbc.Container([
     dcc.Store(id='in-progress-flag', data=False),
     dcc.Store(id='selected-week', data={'value': None}),
     dcc.Store(id='week-options-store', data=False),
-    dcc.Store(id='scores-data', data=[]),
-    dcc.Store(id='nfl-events-data', data={}),
+    dcc.Store(id='scores-version', data=0),
+    dcc.Store(id='season-version', data=None),
+    dcc.Store(id='stale-reason', data=None),
     dbc.Row(
         dbc.Col(
             html.Div(
                 [
-                    html.Img(src="assets/nfl-3644686_1280.webp", height="50px", style={"marginRight": "10px"}),
+                    html.Img(src=asset_url("nfl-3644686_1280.webp"), height="50px", style={"marginRight": "10px"}),
                     html.H1("NFL Games", style={"display": "inlineBlock", "verticalAlign": "middle"}),
                 ],
                 style={"display": "flex", "alignItems": "center", "justifyContent": "center"}
@@ -39,6 +41,7 @@ layout = dbc.Container([
             'justifyContent': 'center'
         },
     ))),
+    dbc.Row(dbc.Col(html.Div(id='stale-note'))),
     dbc.Row(
         dbc.Col(
             dcc.Loading(
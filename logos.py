@@ -0,0 +1,103 @@
+# logos.py
+"""Team logo thumbnails, resized once from the ESPN originals and served from our own origin."""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import httpx
+from PIL import Image
+from config import LOGO_DIR, LOGO_SIZES
+from shared_cache import backend as shared_backend
+
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+FETCH_TIMEOUT = 10
+FAILURE_RETRY = 60  # Seconds before a logo whose download failed is tried again
+_NAME = re.compile(r'^([0-9a-f]{16})-([0-9]+)\.png$')
+
+_sources = {}  # key -> source URL registered by this process
+_fetch_locks = {}  # key -> lock held while the logo is downloaded and resized
+_failures = {}  # key -> time.monotonic() of the last failed download
+_lock = threading.Lock()
+
+
+class LogoUnavailable(OSError):
+    """Raised instead of downloading a logo again within FAILURE_RETRY of a failed attempt."""
+
+
+def logo_url(source, size):
+    """Return the local thumbnail URL for an ESPN logo URL shown at size px, or source if it is empty."""
+    if not source:
+        return source
+    key = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+    if key not in _sources:
+        _sources[key] = source
+        shared_backend.set(f"logos:{key}", source, time.time(), float('inf'), float('inf'))
+    return f"/logos/{key}-{size}.png"
+
+
+def source_url(name):
+    """Return the ESPN URL behind a thumbnail name from logo_url(), or None."""
+    match = _NAME.match(name)
+    if match is None:
+        return None
+    key = match.group(1)
+    source = _sources.get(key)
+    if source is None:
+        shared = shared_backend.get(f"logos:{key}")
+        if shared is not None:
+            source = _sources[key] = shared[0]
+    return source
+
+
+def thumbnail(name):
+    """Return the file path of a thumbnail named by logo_url(), creating it on first use, or None.
+
+    Raises httpx.HTTPError or OSError if the download fails, and LogoUnavailable while a failure is remembered."""
+    match = _NAME.match(name)
+    if match is None or int(match.group(2)) not in LOGO_SIZES:
+        return None
+    path = os.path.join(LOGO_DIR, name)
+    if os.path.exists(path):
+        return path
+    source = source_url(name)
+    if source is None:
+        return None
+
+    key = match.group(1)
+    _raise_if_failed(key)
+    with _lock:
+        fetch_lock = _fetch_locks.setdefault(key, threading.Lock())
+    with fetch_lock:
+        # Requests that waited for the lock take the holder's outcome rather than downloading again
+        if not os.path.exists(path):
+            _raise_if_failed(key)
+            try:
+                _store_thumbnails(key, source)
+            except (httpx.HTTPError, OSError):
+                _failures[key] = time.monotonic()
+                raise
+            _failures.pop(key, None)
+    return path
+
+
+def _raise_if_failed(key):
+    failed_at = _failures.get(key)
+    if failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY:
+        raise LogoUnavailable(f"Logo {key} failed to download {time.monotonic() - failed_at:.0f} seconds ago")
+
+
+def _store_thumbnails(key, source):
+    """Download source once and write a PNG of every size in LOGO_SIZES."""
+    response = httpx.get(source, timeout=FETCH_TIMEOUT, follow_redirects=True)
+    response.raise_for_status()
+    logo = Image.open(io.BytesIO(response.content)).convert('RGBA')
+    os.makedirs(LOGO_DIR, exist_ok=True)
+    for size in LOGO_SIZES:
+        resized = logo.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        path = os.path.join(LOGO_DIR, f"{key}-{size}.png")
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # Workers sharing LOGO_DIR each write their own
+        resized.save(tmp_path, 'PNG', optimize=True)
+        os.replace(tmp_path, path)
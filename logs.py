@@ -0,0 +1,102 @@
+# logs.py
+"""Structured JSON logging through a bounded queue, so request threads never block on I/O."""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from config import LOG_LEVEL, LOG_QUEUE_SIZE
+from metrics import LOG_RECORDS_DROPPED
+
+# Third-party loggers that log every request at INFO
+QUIET_LOGGERS = ('httpx', 'httpcore', 'hpack')
+
+_listener = None
+_configure_lock = threading.Lock()
+
+# Attributes every LogRecord has; anything else was passed through extra= and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'sample', 'taskName'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format a record as one JSON object with its extra= fields at the top level."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'severity': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass one in every ``record.sample`` records of each message template."""
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}  # (logger name, message template) -> records seen
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, 'sample', 1)
+        if every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        if seen % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full and leaves formatting to the listener."""
+
+    def prepare(self, record):
+        # Freeze the message now so later changes to its args cannot alter it; the JSON
+        # encoding and traceback formatting happen on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def configure_logging(level=LOG_LEVEL):
+    """Install the queued JSON handler on the root logger. Safe to call more than once."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(records)
+        handler.addFilter(SamplingFilter())
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JSONFormatter())
+        _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)  # Flush queued records on shutdown
+
+        root = logging.getLogger()
+        root.handlers[:] = [handler]
+        root.setLevel(level)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
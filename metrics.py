@@ -0,0 +1,93 @@
+# metrics.py
+import os
+import time
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+                               multiprocess)
+
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'RapidAPI request latency per attempt', ['endpoint'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20),
+)
+UPSTREAM_RESPONSES = Counter(
+    'upstream_responses_total', 'RapidAPI responses per attempt by status code ("error" for transport errors)',
+    ['endpoint', 'status'],
+)
+UPSTREAM_COALESCED = Counter('upstream_coalesced_total', 'Upstream calls answered by an identical request already in flight',
+                            ['endpoint'])
+UPSTREAM_HEDGES = Counter('upstream_hedged_requests_total', 'Duplicate requests sent because the first was slow',
+                          ['endpoint'])
+UPSTREAM_STALE_SERVED = Counter('upstream_stale_responses_total',
+                                'Last good responses served in place of a request (reason: quota, circuit or error)',
+                                ['endpoint', 'reason'])
+UPSTREAM_BREAKER_STATE = Gauge('upstream_breaker_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)',
+                               ['endpoint'], multiprocess_mode='max')
+UPSTREAM_BREAKER_OPENED = Counter('upstream_breaker_opened_total', 'Times the circuit breaker opened', ['endpoint'])
+RAPIDAPI_QUOTA_USED = Counter('rapidapi_requests_total', 'RapidAPI requests sent, counted against the quota')
+RAPIDAPI_QUOTA_REMAINING = Gauge(
+    'rapidapi_requests_remaining', 'Requests left in the RapidAPI quota, as last reported by the upstream',
+    multiprocess_mode='mostrecent',
+)
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by result (hit, stale or miss)', ['cache', 'result'])
+ODDS_STORE_LOOKUPS = Counter('odds_store_lookups_total', 'Odds lookups served from the odds store (hit) or upstream (miss)',
+                             ['result'])
+CALLBACK_LATENCY = Histogram(
+    'dash_callback_duration_seconds', 'Dash callback request time', ['callback'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+CALLBACK_RESPONSE_BYTES = Histogram(
+    'dash_callback_response_bytes', 'Dash callback response body size', ['callback'],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+QUOTA_DENIED = Counter('upstream_quota_denied_total', 'Upstream requests not sent because the quota budget was short',
+                       ['endpoint'])
+QUOTA_TOKENS = Gauge('upstream_quota_tokens', 'Requests available in the quota token bucket',
+                     multiprocess_mode='mostrecent')
+QUOTA_SPENT_MONTH = Gauge('upstream_quota_spent_month', 'Upstream requests spent this calendar month (UTC)',
+                          multiprocess_mode='mostrecent')
+QUOTA_EXHAUSTION = Gauge('upstream_quota_projected_exhaustion_timestamp_seconds',
+                         'When the monthly budget runs out at the current spend rate (0 if it lasts the month)',
+                         multiprocess_mode='mostrecent')
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+
+def observe_upstream(endpoint, started, response=None):
+    """Record one upstream attempt that started at time.perf_counter() value started."""
+    UPSTREAM_LATENCY.labels(endpoint).observe(time.perf_counter() - started)
+    if response is None:
+        UPSTREAM_RESPONSES.labels(endpoint, 'error').inc()
+        return
+
+    UPSTREAM_RESPONSES.labels(endpoint, response.status_code).inc()
+    RAPIDAPI_QUOTA_USED.inc()  # Only requests that reached RapidAPI count against the quota
+    remaining = response.headers.get('x-ratelimit-requests-remaining')
+    if remaining and remaining.isdigit():
+        RAPIDAPI_QUOTA_REMAINING.set(int(remaining))
+
+
+def instrument_dash(server):
+    """Time every Dash callback request on the Flask server and record its response size."""
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path.endswith('/_dash-update-component'):
+            g.callback_started = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        started = g.pop('callback_started', None)
+        if started is not None:
+            body = request.get_json(silent=True) or {}
+            callback = body.get('output', 'unknown')
+            CALLBACK_LATENCY.labels(callback).observe(time.perf_counter() - started)
+            CALLBACK_RESPONSE_BYTES.labels(callback).observe(response.calculate_content_length() or 0)
+        return response
+
+
+def render():
+    """Return (body, content type) for /metrics, summing workers when PROMETHEUS_MULTIPROC_DIR is set."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,144 @@
+# odds_store.py
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+COMPACT_MIN_ENTRIES = 256  # Never compact a log shorter than this
+
+
+class OddsStore:
+    """Thread-safe odds index backed by an append-only, periodically compacted JSON-lines log."""
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self._odds = {}
+        self._log_entries = 0
+        self._lock = threading.Lock()
+        self._lock_file = open(f"{path}.lock", 'a')
+        self._log = None
+
+        with self._lock, self._file_lock():
+            if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+                # Seed from the old single-JSON odds file
+                with open(legacy_path, 'r') as f:
+                    self._odds = json.load(f)
+                self._rewrite()
+            elif self._read_log():
+                self._rewrite()  # Drop a torn line so the next append starts on a clean line
+            self._open_log()
+
+    def get(self, game_id, default=None):
+        """Return the stored odds for game_id."""
+        return self._odds.get(game_id, default)
+
+    def __contains__(self, game_id):
+        return game_id in self._odds
+
+    def __len__(self):
+        return len(self._odds)
+
+    def set(self, game_id, odds):
+        """Store odds for game_id, appending to the log only when the value changed."""
+        with self._lock:
+            if game_id in self._odds and self._odds[game_id] == odds:
+                return
+            line = json.dumps({'game_id': game_id, 'odds': odds}) + '\n'
+            with self._file_lock():
+                self._reopen_if_replaced()
+                self._log.write(line)
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            self._odds[game_id] = odds
+            self._log_entries += 1
+            if self._log_entries > max(COMPACT_MIN_ENTRIES, 2 * len(self._odds)):
+                self._compact()
+
+    def items(self):
+        """Return a copy of every stored (game_id, odds) pair."""
+        with self._lock:
+            return list(self._odds.items())
+
+    def update(self, odds_by_game):
+        """Store several games' odds with a single append and fsync."""
+        with self._lock:
+            changed = {game_id: odds for game_id, odds in odds_by_game.items()
+                       if game_id not in self._odds or self._odds[game_id] != odds}
+            if not changed:
+                return
+            lines = ''.join(json.dumps({'game_id': game_id, 'odds': odds}) + '\n' for game_id, odds in changed.items())
+            with self._file_lock():
+                self._reopen_if_replaced()
+                self._log.write(lines)
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            self._odds.update(changed)
+            self._log_entries += len(changed)
+            if self._log_entries > max(COMPACT_MIN_ENTRIES, 2 * len(self._odds)):
+                self._compact()
+
+    def compact(self):
+        """Rewrite the log so it holds exactly one line per game."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        with self._file_lock():
+            # Re-read first so entries appended by other processes survive the rewrite
+            self._read_log()
+            self._rewrite()
+            self._open_log()
+
+    def _read_log(self):
+        """Load the log into memory, returning True if it contained unreadable lines."""
+        odds = {}
+        entries = 0
+        torn = False
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        torn = True  # Torn trailing line from a crash mid-append
+                        continue
+                    odds[entry['game_id']] = entry['odds']
+                    entries += 1
+        except FileNotFoundError:
+            pass
+        self._odds = odds
+        self._log_entries = entries
+        return torn
+
+    def _rewrite(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for game_id, odds in self._odds.items():
+                f.write(json.dumps({'game_id': game_id, 'odds': odds}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._log_entries = len(self._odds)
+
+    def _open_log(self):
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.path, 'a')
+
+    def _reopen_if_replaced(self):
+        # Another process may have compacted the log and renamed a new file into place
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._log.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self._open_log()
+
+    @contextmanager
+    def _file_lock(self):
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,257 @@
+# poller.py
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from refresh_schedule import game_state, next_poll_delay
+from shared_cache import MemoryBackend, backend as shared_backend
+from utils import fetch_games_by_day, extract_scores, get_week_index
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 60  # Seconds to wait after a failed poll
+CHANGE_HISTORY = 120  # Versions of per-game change sets kept for changes_since()
+LEASE = 30  # Seconds the polling process holds its lease; it is renewed every LEASE / 3
+FOLLOW_INTERVAL = 1  # Seconds between checks for a new shared snapshot by processes that do not poll
+
+# Keys in the shared backend
+LEASE_KEY = 'scoreboard-poller'  # {'owner', 'expires_at', 'version'}; version is the last one reserved to publish
+HEAD_KEY = 'scoreboard:head'  # {'version', 'delay', 'next_poll_at'}, rewritten after every poll
+SNAPSHOT_KEY = 'scoreboard:snapshot'  # {'version', 'feed', 'changes'}, rewritten for each new version
+
+
+class ScoreboardPoller:
+    """Background thread that polls the day's scoreboard and publishes versioned snapshots.
+
+    Only the process holding the lease in the shared backend polls; the others adopt its snapshots."""
+
+    def __init__(self, fetch, next_delay, backend=None):
+        self.delay = None  # Seconds from the last poll to the next, as last scheduled
+        self.next_poll_at = 0  # Epoch seconds of the next scheduled poll
+        self.backend = backend or MemoryBackend()
+        self._fetch = fetch
+        self._next_delay = next_delay
+        self._id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leading = False
+        self._lease_checked_at = 0
+        self._snapshot = {'version': 0, 'scores': [], 'games': {}, 'in_progress': False, 'feed': None}
+        self._changes = deque(maxlen=CHANGE_HISTORY)  # (version, IDs of games that changed in it)
+        self._listeners = set()  # Callables notified after each new snapshot version
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the polling thread if it is not already running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='scoreboard-poller', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def subscribe(self, listener):
+        """Call listener() from the poller thread whenever a new snapshot version is published."""
+        with self._lock:
+            self._listeners.add(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            self._listeners.discard(listener)
+
+    def snapshot(self):
+        """Return the latest {'version', 'scores', 'games', 'in_progress', 'feed'} snapshot."""
+        with self._lock:
+            return self._snapshot
+
+    def changes_since(self, version):
+        """Return the IDs of games that changed after a version, or None if that is unknown."""
+        with self._lock:
+            latest = self._snapshot['version']
+            if version == latest:
+                return set()
+            if version is None or version > latest or not self._changes or version < self._changes[0][0] - 1:
+                return None  # Too old (or not yet adopted here); the caller must refresh everything
+            changed = set()
+            for change_version, game_ids in self._changes:
+                if change_version > version:
+                    changed |= game_ids
+            return changed
+
+    def poll_once(self):
+        """Fetch the scoreboard and publish a new snapshot version if anything changed and this process polls."""
+        if not self._claim_lease():
+            return
+        games_data = self._fetch()
+        if not games_data:
+            logger.info("No games data found.")
+            return
+        self._publish(games_data)
+
+    def restore(self, games_data):
+        """Publish a persisted scoreboard response, or adopt the one another process already published."""
+        if self.backend.get(HEAD_KEY) is not None:
+            self._follow()
+        elif games_data and self._claim_lease():
+            self._publish(games_data)
+
+    def _publish(self, games_data):
+        scores, in_progress = extract_scores(games_data)
+        games = {game['game_id']: game for game in scores}
+        with self._lock:
+            current = self._snapshot
+            if scores == current['scores'] and in_progress == current['in_progress']:
+                return
+            changed = {game_id for game_id, game in games.items() if current['games'].get(game_id) != game}
+
+        # A poll can outlast the lease, so the version is only taken if this process still holds it
+        version = self._reserve(current['version'] + 1)
+        if version is None:
+            self._lose_lease()
+            return
+
+        with self._lock:
+            self._changes.append((version, changed))
+            self._snapshot = {'version': version, 'scores': scores, 'games': games, 'in_progress': in_progress,
+                              'feed': games_data}
+            changes = [[change_version, sorted(game_ids)] for change_version, game_ids in self._changes]
+            listeners = list(self._listeners)
+
+        self.backend.set(SNAPSHOT_KEY, {'version': version, 'feed': games_data, 'changes': changes},
+                         time.time(), float('inf'), float('inf'))
+        self._write_head()
+        logger.info("Published scoreboard version %d", version, extra={'changed_games': len(changed)})
+
+        for listener in listeners:
+            listener()
+
+    def _adopt(self, shared):
+        """Take over a snapshot another process published."""
+        scores, in_progress = extract_scores(shared['feed'])
+        games = {game['game_id']: game for game in scores}
+        with self._lock:
+            self._changes = deque(((version, set(game_ids)) for version, game_ids in shared['changes']),
+                                  maxlen=CHANGE_HISTORY)
+            self._snapshot = {'version': shared['version'], 'scores': scores, 'games': games,
+                              'in_progress': in_progress, 'feed': shared['feed']}
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener()
+
+    def _write_head(self):
+        head = {'version': self._snapshot['version'], 'delay': self.delay, 'next_poll_at': self.next_poll_at}
+        self.backend.set(HEAD_KEY, head, time.time(), float('inf'), float('inf'))
+
+    def _follow(self):
+        """Adopt the schedule and, if it is newer, the snapshot of the polling process."""
+        shared = self.backend.get(HEAD_KEY)
+        if shared is None:
+            return
+        head = shared[0]
+        self.delay, self.next_poll_at = head['delay'], head['next_poll_at']
+        if head['version'] == self._snapshot['version']:
+            return
+        shared = self.backend.get(SNAPSHOT_KEY)
+        if shared is not None and shared[0]['version'] == head['version']:
+            self._adopt(shared[0])
+
+    def _reserve(self, version):
+        """Renew the lease and reserve a snapshot version above any reserved before; None if the lease is lost."""
+        now = time.time()
+
+        def reserve(state):
+            if state is None or state['owner'] != self._id or state['expires_at'] <= now:
+                return state, None
+            # A holder that stopped between reserving and writing leaves a version to skip
+            reserved = max(version, state.get('version', 0) + 1)
+            return {'owner': self._id, 'expires_at': now + LEASE, 'version': reserved}, reserved
+
+        return self.backend.transact(LEASE_KEY, reserve)
+
+    def _renew(self):
+        """Renew the lease if this process still holds it; return whether it does."""
+        now = time.time()
+
+        def renew(state):
+            if state is None or state['owner'] != self._id or state['expires_at'] <= now:
+                return state, False
+            return dict(state, expires_at=now + LEASE), True
+
+        return self.backend.transact(LEASE_KEY, renew)
+
+    def _lose_lease(self):
+        logger.warning("Lost the scoreboard polling lease; following the new holder")
+        self._leading = False
+        self._follow()
+
+    def _claim_lease(self):
+        """Take or renew the polling lease at most every LEASE / 3 seconds; return whether this process holds it."""
+        now = time.time()
+        if now - self._lease_checked_at < LEASE / 3:
+            return self._leading
+        self._lease_checked_at = now
+
+        def claim(state):
+            if state is None or state['owner'] == self._id or state['expires_at'] <= now:
+                return {'owner': self._id, 'expires_at': now + LEASE, 'version': (state or {}).get('version', 0)}, True
+            return state, False
+
+        if not self.backend.transact(LEASE_KEY, claim):
+            self._leading = False
+        elif not self._leading:
+            self._follow()  # Continue from the last holder's versions and schedule
+            self._leading = True
+            logger.info("Took over scoreboard polling")
+        return self._leading
+
+    def _poll(self):
+        if time.time() < self.next_poll_at:
+            return
+        try:
+            self.poll_once()
+            self.delay = self._next_delay()
+        except Exception:
+            logger.exception("Scoreboard poll failed")
+            self.delay = RETRY_DELAY
+        self.next_poll_at = time.time() + self.delay
+        if self._renew():
+            self._write_head()
+        elif self._leading:
+            self._lose_lease()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._claim_lease():
+                    self._poll()
+                    wait = min(max(self.next_poll_at - time.time(), 0), LEASE / 3)
+                else:
+                    self._follow()
+                    wait = FOLLOW_INTERVAL
+            except Exception:
+                logger.exception("Scoreboard poller failed")
+                wait = FOLLOW_INTERVAL
+            self._stop.wait(wait)
+
+
+def game_is_final(game_id):
+    """Return whether a game is over, preferring the live scoreboard to the cached season feed."""
+    live_scores = scoreboard_poller.snapshot()['games'].get(game_id)
+    if live_scores:
+        return live_scores['Game Status'] == 'Final'
+    week_index = get_week_index()
+    event = week_index.events.get(game_id) if week_index else None
+    return event is not None and game_state(event) == 'post'
+
+
+def _next_poll_delay():
+    return next_poll_delay(get_week_index(), scoreboard_poller.snapshot()['in_progress'])
+
+
+scoreboard_poller = ScoreboardPoller(fetch_games_by_day, _next_poll_delay, backend=shared_backend)
@@ -0,0 +1,121 @@
+# quota.py
+"""Ration upstream requests to the RapidAPI plan's daily and monthly budget."""
+import calendar
+import time
+from datetime import datetime, timezone
+import httpx
+from config import QUOTA_DAILY_BUDGET, QUOTA_MONTHLY_BUDGET, QUOTA_BURST
+from metrics import QUOTA_DENIED, QUOTA_TOKENS, QUOTA_SPENT_MONTH, QUOTA_EXHAUSTION
+from shared_cache import MemoryBackend, backend as shared_backend
+
+RATIONING_WINDOW = 10 * 60  # Seconds after a denied request during which data is reported as possibly stale
+RATIONING_CHECK_INTERVAL = 5  # Seconds between reads of the shared state for rationing()
+
+
+class QuotaExhausted(httpx.HTTPError):
+    """Raised instead of sending an upstream request the budget cannot cover."""
+
+
+def _month_bounds(now):
+    """Return (start, end) epoch seconds of the UTC calendar month containing now."""
+    moment = datetime.fromtimestamp(now, timezone.utc)
+    start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    days = calendar.monthrange(moment.year, moment.month)[1]
+    return start.timestamp(), start.timestamp() + days * 86400
+
+
+class QuotaScheduler:
+    """Token bucket with per-priority reserves and a monthly spend cap, shared through a backend."""
+
+    def __init__(self, daily_budget=0, monthly_budget=0, burst=None, backend=None):
+        self.daily_budget = daily_budget
+        self.monthly_budget = monthly_budget
+        self.burst = burst or daily_budget or monthly_budget / 30  # Also the scale for reserves
+        self.backend = backend or MemoryBackend()
+        self._denied_seen = (0, None)  # (checked at, denied_at) from the last read of the shared state
+
+    def try_acquire(self, reserve=0.0, endpoint='unknown'):
+        """Spend one request if the budget left above reserve allows it, returning whether it did."""
+        def spend(state):
+            month_left = self.monthly_budget - state['spent_month']
+            if ((self.daily_budget and state['tokens'] - 1 < self.burst * reserve)
+                    or (self.monthly_budget and month_left - 1 < self.burst * reserve)):
+                state['denied_at'] = time.time()
+                return False
+            if self.daily_budget:
+                state['tokens'] -= 1
+            state['spent_month'] += 1
+            return True
+
+        acquired = self._transact(spend)
+        if not acquired:
+            QUOTA_DENIED.labels(endpoint).inc()
+        return acquired
+
+    def sync_remaining(self, remaining):
+        """Adopt the upstream's own count of requests left this month when it reports more spend."""
+        if not self.monthly_budget:
+            return
+
+        def sync(state):
+            state['spent_month'] = max(state['spent_month'], self.monthly_budget - remaining)
+
+        self._transact(sync)
+
+    def rationing(self):
+        """Return whether a request was denied recently, so cached data may be out of date."""
+        checked_at, denied_at = self._denied_seen
+        if time.time() - checked_at > RATIONING_CHECK_INTERVAL:
+            denied_at = self._transact(lambda state: state['denied_at'])
+            self._denied_seen = (time.time(), denied_at)
+        return denied_at is not None and time.time() - denied_at < RATIONING_WINDOW
+
+    def status(self):
+        """Return the current spend, budgets and projected exhaustion time as a JSON-ready dict."""
+        state = self._transact(dict)
+        exhausted_at = self._projected_exhaustion(state)
+        return {
+            'spent_month': state['spent_month'],
+            'monthly_budget': self.monthly_budget or None,
+            'remaining_month': self.monthly_budget - state['spent_month'] if self.monthly_budget else None,
+            'daily_budget': self.daily_budget or None,
+            'tokens': round(state['tokens'], 1) if self.daily_budget else None,
+            'month_resets_at': datetime.fromtimestamp(state['month_end'], timezone.utc).isoformat(),
+            'projected_exhaustion': (datetime.fromtimestamp(exhausted_at, timezone.utc).isoformat()
+                                     if exhausted_at else None),
+            'rationing': state['denied_at'] is not None and time.time() - state['denied_at'] < RATIONING_WINDOW,
+        }
+
+    def _projected_exhaustion(self, state):
+        """Return when the monthly budget runs out at this month's average spend rate, or None if it lasts."""
+        if not self.monthly_budget or not state['spent_month']:
+            return None
+        now = time.time()
+        rate = state['spent_month'] / max(now - state['month_start'], 1)
+        exhausted_at = now + (self.monthly_budget - state['spent_month']) / rate
+        return exhausted_at if exhausted_at < state['month_end'] else None
+
+    def _transact(self, change):
+        """Apply change(state) to the refilled bucket state atomically and return its result."""
+        def update(state):
+            now = time.time()
+            if state is None or now >= state['month_end']:
+                month_start, month_end = _month_bounds(now)
+                tokens = state['tokens'] if state else self.burst
+                state = {'tokens': tokens, 'refilled_at': now, 'month_start': month_start,
+                         'month_end': month_end, 'spent_month': 0, 'denied_at': None}
+            if self.daily_budget:
+                elapsed = max(now - state['refilled_at'], 0)
+                state['tokens'] = min(self.burst, state['tokens'] + elapsed * self.daily_budget / 86400)
+            state['refilled_at'] = now
+            result = change(state)
+            return state, (result, dict(state))
+
+        result, state = self.backend.transact('quota', update)
+        QUOTA_TOKENS.set(state['tokens'])
+        QUOTA_SPENT_MONTH.set(state['spent_month'])
+        QUOTA_EXHAUSTION.set(self._projected_exhaustion(state) or 0)
+        return result
+
+
+scheduler = QuotaScheduler(QUOTA_DAILY_BUDGET, QUOTA_MONTHLY_BUDGET, QUOTA_BURST, backend=shared_backend)
@@ -0,0 +1,54 @@
+# refresh_schedule.py
+import time
+from config import (LIVE_POLL_INTERVAL, PREGAME_POLL_INTERVAL, PREGAME_WINDOW, IDLE_POLL_INTERVAL,
+                    KICKOFF_LEAD, MAX_GAME_LENGTH)
+
+
+def game_state(event):
+    """Return 'pre', 'in' or 'post' for an event or scoreboard status."""
+    status_type = event.get('status', {}).get('type', {})
+    state = status_type.get('state')
+    if state:
+        return state
+    description = status_type.get('description')
+    if description == 'Scheduled':
+        return 'pre'
+    if description == 'Final':
+        return 'post'
+    return 'in'
+
+
+def next_poll_delay(week_index, scores_in_progress=False, now=None):
+    """Return how many seconds to wait before the next scoreboard poll."""
+    now = time.time() if now is None else now
+    if scores_in_progress:
+        return LIVE_POLL_INTERVAL
+    if week_index is None:
+        return PREGAME_POLL_INTERVAL  # No schedule to go on; poll at a modest rate
+
+    # The season feed is cached, so a game that just kicked off may still read 'pre'
+    recent_games = week_index.events_between(now - MAX_GAME_LENGTH, now)
+    if any(game_state(event) != 'post' for event in recent_games):
+        return LIVE_POLL_INTERVAL
+
+    next_kickoff = week_index.next_kickoff(now)
+    if next_kickoff is None:
+        return IDLE_POLL_INTERVAL
+
+    until_kickoff = next_kickoff - now
+    if until_kickoff <= PREGAME_WINDOW:
+        return max(LIVE_POLL_INTERVAL, min(PREGAME_POLL_INTERVAL, until_kickoff - KICKOFF_LEAD))
+    return min(IDLE_POLL_INTERVAL, until_kickoff - PREGAME_WINDOW)
+
+
+def client_interval_ms(next_poll_at, games_in_progress=False, week_index=None, now=None):
+    """Return the dcc.Interval period for browsers, tracking the server poll schedule."""
+    now = time.time() if now is None else now
+    if games_in_progress:
+        return LIVE_POLL_INTERVAL * 1000
+    wait = next_poll_at - now
+    next_kickoff = week_index.next_kickoff(now) if week_index is not None else None
+    if next_kickoff is not None:
+        until_window = next_kickoff - PREGAME_WINDOW - now
+        wait = min(wait, until_window if until_window > 0 else next_kickoff - now)
+    return int(max(LIVE_POLL_INTERVAL, wait) * 1000)
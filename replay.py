@@ -0,0 +1,104 @@
+# replay.py
+"""Record upstream responses and replay them from a local stand-in for the RapidAPI host."""
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_right
+from urllib.parse import urlsplit
+from fastapi import FastAPI, Request, Response
+from config import RECORDING_PATH, REPLAY_PORT, REPLAY_SPEED, REPLAY_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Params that name "today" rather than a resource; recordings match regardless of their value
+WILDCARD_PARAMS = {'day'}
+
+_record_lock = threading.Lock()
+
+
+def record(url, params, response, elapsed):
+    """Append one upstream response to the recording corpus, logging rather than raising on failure."""
+    entry = {
+        't': time.time(),
+        'elapsed': round(elapsed, 4),
+        'path': urlsplit(url).path,
+        'params': {key: str(value) for key, value in (params or {}).items()},
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type', 'application/json'),
+        'body': response.text,
+    }
+    line = json.dumps(entry) + '\n'
+    try:
+        with _record_lock:
+            os.makedirs(os.path.dirname(RECORDING_PATH) or '.', exist_ok=True)
+            with open(RECORDING_PATH, 'a') as f:
+                f.write(line)
+    except Exception:
+        # A recording is a side product; the response is still served
+        logger.exception("Could not record response for %s", entry['path'])
+
+
+def _replay_key(path, params):
+    return path, tuple(sorted((key, value) for key, value in params.items() if key not in WILDCARD_PARAMS))
+
+
+class Corpus:
+    """Recorded responses grouped by endpoint and params, each group ordered by recording time."""
+
+    def __init__(self, path):
+        self._timelines = {}  # replay key -> ([offsets], [entries])
+        entries = []
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        entries.sort(key=lambda entry: entry['t'])
+        self.start = entries[0]['t'] if entries else 0
+        self.duration = entries[-1]['t'] - self.start if entries else 0
+
+        for entry in entries:
+            offsets, grouped = self._timelines.setdefault(_replay_key(entry['path'], entry['params']), ([], []))
+            offsets.append(entry['t'] - self.start)
+            grouped.append(entry)
+
+    def __len__(self):
+        return sum(len(offsets) for offsets, _ in self._timelines.values())
+
+    def lookup(self, path, params, offset):
+        """Return the latest entry recorded at or before offset, the first one if none yet, or None."""
+        timeline = self._timelines.get(_replay_key(path, params))
+        if timeline is None:
+            return None
+        offsets, entries = timeline
+        position = max(bisect_right(offsets, offset) - 1, 0)
+        return entries[position]
+
+
+def create_replay_app(corpus, speed=REPLAY_SPEED, latency=REPLAY_LATENCY):
+    """Return an ASGI app serving corpus in place of the RapidAPI host."""
+    app = FastAPI()
+    started = time.monotonic()
+
+    @app.get("/{endpoint}")
+    async def replay(endpoint: str, request: Request):
+        offset = (time.monotonic() - started) * speed
+        entry = corpus.lookup(f"/{endpoint}", dict(request.query_params), offset)
+        if entry is None:
+            return Response(status_code=404)
+        if latency:
+            await asyncio.sleep(entry['elapsed'] / speed)
+        return Response(entry['body'], status_code=entry['status'], media_type=entry['content_type'])
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    corpus = Corpus(sys.argv[1] if len(sys.argv) > 1 else RECORDING_PATH)
+    print(f"Replaying {len(corpus)} responses spanning {corpus.duration / 60:.0f} minutes at {REPLAY_SPEED}x")
+    uvicorn.run(create_replay_app(corpus), host="127.0.0.1", port=REPLAY_PORT)
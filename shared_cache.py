@@ -0,0 +1,204 @@
+# shared_cache.py
+"""Cache backends shared by every worker process, and with Redis by every instance."""
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from config import CACHE_BACKEND, CACHE_SQLITE_PATH, CACHE_REDIS_URL
+
+# Every backend stores JSON-serialisable values behind the same methods: get(key) returns
+# (value, fetched_at, ttl) or None, set(key, value, fetched_at, ttl, keep_for), delete(key),
+# acquire(key, timeout) / release(key, token) for load locks, and transact(key, update),
+# which atomically stores update(old)[0] and returns update(old)[1].
+
+
+class MemoryBackend:
+    """Backend local to one process, for single-worker runs."""
+
+    def __init__(self):
+        self._entries = {}  # key -> (value, fetched_at, ttl, expires_at)
+        self._locks = {}  # key -> (token, expires_at)
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[3] <= time.time():
+            return None
+        return entry[:3]
+
+    def set(self, key, value, fetched_at, ttl, keep_for):
+        with self._lock:
+            self._entries[key] = (value, fetched_at, ttl, fetched_at + keep_for)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def acquire(self, key, timeout):
+        now = time.time()
+        with self._lock:
+            held = self._locks.get(key)
+            if held is not None and held[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, now + timeout)
+            return token
+
+    def release(self, key, token):
+        with self._lock:
+            if self._locks.get(key, (None,))[0] == token:
+                del self._locks[key]
+
+    def transact(self, key, update):
+        with self._lock:
+            self._state[key], result = update(self._state.get(key))
+            return result
+
+
+class SQLiteBackend:
+    """Backend in a SQLite file shared by the worker processes on one host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()  # One connection per thread
+        db = self._db()
+        db.execute('PRAGMA journal_mode=WAL')  # Readers never wait for the writer
+        db.execute('CREATE TABLE IF NOT EXISTS entries '
+                   '(key TEXT PRIMARY KEY, value TEXT, fetched_at REAL, ttl REAL, expires_at REAL)')
+        db.execute('CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT, expires_at REAL)')
+        db.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        row = self._db().execute('SELECT value, fetched_at, ttl FROM entries WHERE key = ? AND expires_at > ?',
+                                 (key, time.time())).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key, value, fetched_at, ttl, keep_for):
+        db = self._db()
+        db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                   (key, json.dumps(value), fetched_at, ttl, fetched_at + keep_for))
+        db.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),))
+
+    def delete(self, key):
+        self._db().execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def acquire(self, key, timeout):
+        now = time.time()
+        token = uuid.uuid4().hex
+        cursor = self._db().execute(
+            'INSERT INTO locks VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE '
+            'SET token = excluded.token, expires_at = excluded.expires_at WHERE locks.expires_at <= ?',
+            (key, token, now + timeout, now))
+        return token if cursor.rowcount == 1 else None
+
+    def release(self, key, token):
+        self._db().execute('DELETE FROM locks WHERE key = ? AND token = ?', (key, token))
+
+    def transact(self, key, update):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+            value, result = update(json.loads(row[0]) if row else None)
+            db.execute('INSERT OR REPLACE INTO state VALUES (?, ?)', (key, json.dumps(value)))
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+        return result
+
+
+class RedisBackend:
+    """Backend in Redis, shared by every instance pointed at the same server."""
+
+    def __init__(self, client, prefix='nfl-dash:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        import redis  # Only needed when CACHE_BACKEND=redis
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        raw = self.client.get(f"{self.prefix}entry:{key}")
+        if raw is None:
+            return None
+        value, fetched_at, ttl = json.loads(raw)
+        return value, fetched_at, ttl
+
+    def set(self, key, value, fetched_at, ttl, keep_for):
+        expires_in = fetched_at + keep_for - time.time()
+        if expires_in <= 0:
+            return
+        self.client.set(f"{self.prefix}entry:{key}", json.dumps([value, fetched_at, ttl]),
+                        ex=None if math.isinf(expires_in) else math.ceil(expires_in))
+
+    def delete(self, key):
+        self.client.delete(f"{self.prefix}entry:{key}")
+
+    def acquire(self, key, timeout):
+        token = uuid.uuid4().hex
+        if self.client.set(f"{self.prefix}lock:{key}", token, nx=True, px=int(timeout * 1000)):
+            return token
+        return None
+
+    def release(self, key, token):
+        self._watched(f"{self.prefix}lock:{key}",
+                      lambda pipe, raw: pipe.delete(f"{self.prefix}lock:{key}") if raw == token.encode() else None)
+
+    def transact(self, key, update):
+        redis_key = f"{self.prefix}state:{key}"
+        outcome = []
+
+        def write(pipe, raw):
+            value, result = update(json.loads(raw) if raw is not None else None)
+            pipe.set(redis_key, json.dumps(value))
+            outcome.append(result)
+
+        self._watched(redis_key, write)
+        return outcome[-1]
+
+    def _watched(self, redis_key, write):
+        # Optimistic transaction: retry when another client changes the key between read and write
+        import redis
+        while True:
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(redis_key)
+                    raw = pipe.get(redis_key)
+                    pipe.multi()
+                    write(pipe, raw)
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+
+def create_backend(kind, sqlite_path=None, redis_url=None):
+    """Return the backend named by CACHE_BACKEND: 'memory', 'sqlite' or 'redis'."""
+    if kind == 'redis':
+        return RedisBackend.from_url(redis_url)
+    if kind == 'sqlite':
+        return SQLiteBackend(sqlite_path)
+    if kind == 'memory':
+        return MemoryBackend()
+    raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+
+
+# Process-wide backend used by the caches in utils.py and by the quota scheduler
+backend = create_backend(CACHE_BACKEND, sqlite_path=CACHE_SQLITE_PATH, redis_url=CACHE_REDIS_URL)
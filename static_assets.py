@@ -0,0 +1,57 @@
+# static_assets.py
+"""Content-fingerprinted asset URLs and the cache policy for everything Flask serves."""
+import functools
+import hashlib
+import os
+import re
+import dash
+from flask import request
+
+ASSETS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+NO_STORE_PATHS = ('/_dash-update-component',)
+
+# Asset links as Dash renders them, versioned by modification time
+_MTIME_ASSET_URL = re.compile(r'/assets/([^"?]+)\?m=[0-9.]+')
+
+
+@functools.lru_cache(maxsize=None)
+def fingerprint(name):
+    """Return a short hash of the content of assets/<name>."""
+    with open(os.path.join(ASSETS_FOLDER, name), 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+def asset_url(name):
+    """Return the fingerprinted URL of assets/<name>."""
+    return f"/assets/{name}?v={fingerprint(name)}"
+
+
+class FingerprintedDash(dash.Dash):
+    """Dash app whose index page links stylesheets, scripts and the favicon by content hash."""
+
+    def interpolate_index(self, **kwargs):
+        index = super().interpolate_index(**kwargs)
+        return _MTIME_ASSET_URL.sub(lambda match: asset_url(match.group(1)), index)
+
+
+def set_cache_headers(response):
+    """Flask after_request hook applying the cache policy described above."""
+    path = request.path
+    if path in NO_STORE_PATHS:
+        response.headers['Cache-Control'] = 'no-store'
+    elif path.startswith('/assets/'):
+        name = path[len('/assets/'):]
+        version = request.args.get('v')
+        fingerprinted = (response.status_code == 200 and version is not None
+                         and version == fingerprint(name))
+        response.headers['Cache-Control'] = IMMUTABLE if fingerprinted else 'no-cache'
+    elif path.startswith('/_dash-component-suites/'):
+        # Dash sets a year-long max-age on bundles whose URL carries its fingerprint
+        if 'max-age=31536000' in response.headers.get('Cache-Control', ''):
+            response.headers['Cache-Control'] = IMMUTABLE
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# config.py reads the environment at import; keep the module-level backend, odds log and
+# snapshots out of the working tree
+_state_dir = tempfile.mkdtemp(prefix='nfl-dash-tests-')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+os.environ.setdefault('ODDS_LOG_PATH', os.path.join(_state_dir, 'odds.jsonl'))
+os.environ.setdefault('SNAPSHOT_DIR', '')
+os.environ.setdefault('LOGO_DIR', os.path.join(_state_dir, 'logo_cache'))
@@ -0,0 +1,79 @@
+# tests/test_breaker.py
+import time
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _breaker(**kwargs):
+    options = {'failure_rate': 0.5, 'min_requests': 4, 'window': 60, 'cooldown': 0.1}
+    options.update(kwargs)
+    return CircuitBreaker('/test', **options)
+
+
+def _record(breaker, *outcomes):
+    for succeeded in outcomes:
+        assert breaker.allow()
+        breaker.record(succeeded)
+
+
+def test_stays_closed_below_the_minimum_number_of_requests():
+    breaker = _breaker()
+    _record(breaker, False, False, False)
+    assert breaker.state == CLOSED
+
+
+def test_opens_when_the_failure_rate_is_reached():
+    breaker = _breaker()
+    _record(breaker, True, False, True, False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_stays_closed_below_the_failure_rate():
+    breaker = _breaker()
+    _record(breaker, True, True, True, False)
+    assert breaker.state == CLOSED
+
+
+def test_outcomes_outside_the_window_are_forgotten():
+    breaker = _breaker(window=0.1)
+    _record(breaker, False, False, False)
+    time.sleep(0.15)
+    _record(breaker, True)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = _breaker()
+    _record(breaker, False, False, False, False)
+    time.sleep(0.15)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_breaker():
+    breaker = _breaker()
+    _record(breaker, False, False, False, False)
+    time.sleep(0.15)
+    _record(breaker, True)
+    assert breaker.state == CLOSED
+    _record(breaker, False, False, False)
+    assert breaker.state == CLOSED  # Failures before it reopened were cleared
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = _breaker()
+    _record(breaker, False, False, False, False)
+    time.sleep(0.15)
+    _record(breaker, False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_cancelled_probe_lets_another_through():
+    breaker = _breaker()
+    _record(breaker, False, False, False, False)
+    time.sleep(0.15)
+    assert breaker.allow()
+    breaker.cancel()
+    assert breaker.allow()
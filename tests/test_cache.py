@@ -0,0 +1,72 @@
+# tests/test_cache.py
+import multiprocessing
+import threading
+import time
+from cache import TTLCache, Uncached
+from shared_cache import MemoryBackend, SQLiteBackend
+
+
+def test_fresh_entries_are_served_without_loading():
+    cache = TTLCache(60)
+    calls = []
+    assert cache.get('key', lambda: calls.append(1) or 'value') == 'value'
+    assert cache.get('key', lambda: calls.append(1) or 'other') == 'value'
+    assert len(calls) == 1
+
+
+def test_uncached_values_are_returned_but_not_stored():
+    backend = MemoryBackend()
+    cache = TTLCache(60, name='test', backend=backend)
+    assert cache.get('key', lambda: Uncached('stale')) == 'stale'
+    assert cache.peek('key') is None
+    assert backend.get('test:key') is None
+    assert cache.get('key', lambda: 'fresh') == 'fresh'
+
+
+def test_first_use_adopts_an_entry_another_process_stored():
+    backend = MemoryBackend()
+    TTLCache(60, name='test', backend=backend).set('key', 'shared')
+    cache = TTLCache(60, name='test', backend=backend)
+    assert cache.get('key', lambda: 'loaded') == 'shared'
+
+
+def test_load_waits_for_the_process_holding_the_load_lock():
+    backend = MemoryBackend()
+    token = backend.acquire('test:key', 30)
+    other = TTLCache(60, name='test', backend=backend)
+
+    def finish_load():
+        time.sleep(0.3)
+        other.set('key', 'from other process')
+        backend.release('test:key', token)
+
+    threading.Thread(target=finish_load).start()
+    cache = TTLCache(60, name='test', backend=backend)
+    assert cache.get('key', lambda: 'loaded here') == 'from other process'
+
+
+def _load_in_process(path, count_path, results):
+    def loader():
+        with open(count_path, 'a') as f:
+            f.write('load\n')
+        time.sleep(0.5)
+        return 'value'
+
+    cache = TTLCache(60, name='test', backend=SQLiteBackend(path))
+    results.put(cache.get('key', loader))
+
+
+def test_processes_missing_the_same_key_load_it_once(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    count_path = tmp_path / 'loads'
+    SQLiteBackend(path)  # Create the schema before the processes race for it
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=_load_in_process, args=(path, str(count_path), results)) for _ in range(6)]
+    for process in processes:
+        process.start()
+    values = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    assert values == ['value'] * 6
+    assert count_path.read_text().splitlines() == ['load']
@@ -0,0 +1,51 @@
+# tests/test_logos.py
+import threading
+import time
+import httpx
+import pytest
+import logos
+
+
+def _failing_get(calls, delay=0):
+    def get(url, **kwargs):
+        calls.append(url)
+        time.sleep(delay)
+        raise httpx.ConnectTimeout("timed out")
+    return get
+
+
+def test_a_failed_download_is_not_retried_until_failure_retry_passes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(logos.httpx, 'get', _failing_get(calls))
+    name = logos.logo_url('https://example.com/failing.png', 30)[len('/logos/'):]
+
+    with pytest.raises(httpx.ConnectTimeout):
+        logos.thumbnail(name)
+    with pytest.raises(logos.LogoUnavailable):
+        logos.thumbnail(name)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(logos, 'FAILURE_RETRY', 0)
+    with pytest.raises(httpx.ConnectTimeout):
+        logos.thumbnail(name)
+    assert len(calls) == 2
+
+
+def test_requests_waiting_on_a_download_share_its_failure(monkeypatch):
+    calls, errors = [], []
+    monkeypatch.setattr(logos.httpx, 'get', _failing_get(calls, delay=0.2))
+    name = logos.logo_url('https://example.com/slow.png', 60)[len('/logos/'):]
+
+    def request():
+        try:
+            logos.thumbnail(name)
+        except (httpx.HTTPError, OSError) as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(errors) == 4
@@ -0,0 +1,60 @@
+# tests/test_odds_store.py
+import json
+import odds_store
+from odds_store import OddsStore
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_odds_survive_a_reopen(tmp_path):
+    path = tmp_path / 'odds.jsonl'
+    store = OddsStore(str(path))
+    store.set('1', 'KC -3.5')
+    store.update({'2': 'BUF -1', '3': 'DAL +2'})
+    assert dict(OddsStore(str(path)).items()) == {'1': 'KC -3.5', '2': 'BUF -1', '3': 'DAL +2'}
+
+
+def test_unchanged_odds_are_not_appended(tmp_path):
+    path = tmp_path / 'odds.jsonl'
+    store = OddsStore(str(path))
+    store.set('1', 'KC -3.5')
+    store.set('1', 'KC -3.5')
+    assert len(_lines(path)) == 1
+
+
+def test_torn_trailing_line_is_dropped_on_open(tmp_path):
+    path = tmp_path / 'odds.jsonl'
+    path.write_text(json.dumps({'game_id': '1', 'odds': 'KC -3.5'}) + '\n{"game_id": "2", "od')
+    store = OddsStore(str(path))
+    assert dict(store.items()) == {'1': 'KC -3.5'}
+    store.set('2', 'BUF -1')
+    assert _lines(path) == [{'game_id': '1', 'odds': 'KC -3.5'}, {'game_id': '2', 'odds': 'BUF -1'}]
+
+
+def test_log_is_compacted_to_one_line_per_game(tmp_path, monkeypatch):
+    monkeypatch.setattr(odds_store, 'COMPACT_MIN_ENTRIES', 4)
+    path = tmp_path / 'odds.jsonl'
+    store = OddsStore(str(path))
+    for line in range(1, 6):
+        store.set('1', f"KC -{line}")
+    assert _lines(path) == [{'game_id': '1', 'odds': 'KC -5'}]
+    assert store.get('1') == 'KC -5'
+
+
+def test_compaction_keeps_entries_appended_by_another_process(tmp_path):
+    path = tmp_path / 'odds.jsonl'
+    store = OddsStore(str(path))
+    other = OddsStore(str(path))
+    store.set('1', 'KC -3.5')
+    other.set('2', 'BUF -1')
+    store.compact()
+    assert dict(OddsStore(str(path)).items()) == {'1': 'KC -3.5', '2': 'BUF -1'}
+
+
+def test_legacy_file_seeds_a_new_log(tmp_path):
+    legacy = tmp_path / 'odds.json'
+    legacy.write_text(json.dumps({'1': 'KC -3.5'}))
+    store = OddsStore(str(tmp_path / 'odds.jsonl'), legacy_path=str(legacy))
+    assert store.get('1') == 'KC -3.5'
@@ -0,0 +1,62 @@
+# tests/test_poller.py
+from poller import HEAD_KEY, LEASE_KEY, SNAPSHOT_KEY, ScoreboardPoller
+from shared_cache import MemoryBackend
+
+
+def _feed(home_score):
+    return {'events': [{'id': '1', 'competitions': [{
+        'competitors': [{'team': {'displayName': 'Home'}, 'score': str(home_score)},
+                        {'team': {'displayName': 'Away'}, 'score': '0'}],
+        'status': {'period': 1, 'displayClock': '15:00', 'type': {'description': 'In Progress', 'state': 'in'}},
+    }]}]}
+
+
+def _poller(backend, feeds):
+    return ScoreboardPoller(lambda: feeds.pop(0), lambda: 60, backend=backend)
+
+
+def _expire_lease(backend):
+    backend.transact(LEASE_KEY, lambda state: (dict(state, expires_at=0), None))
+
+
+def test_only_the_lease_holder_polls():
+    backend = MemoryBackend()
+    leader, follower = _poller(backend, [_feed(3)]), _poller(backend, [_feed(7)])
+    leader.poll_once()
+    follower.poll_once()
+    assert leader.snapshot()['version'] == 1
+    assert follower.snapshot()['version'] == 0
+    follower._follow()
+    assert follower.snapshot()['games'] == leader.snapshot()['games']
+
+
+def test_a_poll_that_outlasts_the_lease_does_not_publish():
+    backend = MemoryBackend()
+    first, second = _poller(backend, [_feed(3), _feed(10)]), _poller(backend, [_feed(7)])
+    first.poll_once()
+
+    # The first poller's lease lapses mid-poll and the second takes over and publishes
+    _expire_lease(backend)
+    second.poll_once()
+    assert second.snapshot()['version'] == 2
+    first.poll_once()
+
+    # The first poller's result is dropped and it adopts the new holder's snapshot
+    head = backend.get(HEAD_KEY)[0]
+    assert head['version'] == 2
+    assert backend.get(SNAPSHOT_KEY)[0]['feed'] == _feed(7)
+    assert not first._leading
+    assert first.snapshot()['games'] == second.snapshot()['games']
+
+
+def test_versions_reserved_but_never_written_are_skipped():
+    backend = MemoryBackend()
+    first, second = _poller(backend, [_feed(3)]), _poller(backend, [_feed(7)])
+    first.poll_once()
+
+    # The first poller reserves version 2 and stops before writing its snapshot
+    first._reserve(2)
+    _expire_lease(backend)
+    second.poll_once()
+    assert second.snapshot()['version'] == 3
+    assert backend.get(HEAD_KEY)[0]['version'] == 3
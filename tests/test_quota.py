@@ -0,0 +1,65 @@
+# tests/test_quota.py
+from datetime import datetime, timezone
+import pytest
+import quota
+from quota import QuotaScheduler
+from shared_cache import MemoryBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for quota.py, starting mid-month."""
+    now = [datetime(2024, 10, 15, 12, tzinfo=timezone.utc).timestamp()]
+    monkeypatch.setattr(quota.time, 'time', lambda: now[0])
+    return now
+
+
+def test_unlimited_budget_always_acquires_and_counts_spend(clock):
+    scheduler = QuotaScheduler()
+    assert all(scheduler.try_acquire(0.5) for _ in range(100))
+    assert scheduler.status()['spent_month'] == 100
+
+
+def test_reserve_stops_lower_priorities_first(clock):
+    scheduler = QuotaScheduler(daily_budget=10, backend=MemoryBackend())
+    spent = 0
+    while scheduler.try_acquire(0.5):
+        spent += 1
+    assert spent == 5  # Half the bucket is reserved from this priority
+    assert scheduler.try_acquire(0)  # Higher priorities still have budget
+    assert scheduler.rationing()
+
+
+def test_bucket_refills_at_the_daily_rate(clock):
+    scheduler = QuotaScheduler(daily_budget=24, backend=MemoryBackend())
+    while scheduler.try_acquire(0):
+        pass
+    clock[0] += 3600  # One hour refills one request
+    assert scheduler.try_acquire(0)
+    assert not scheduler.try_acquire(0)
+
+
+def test_monthly_cap_applies_and_resets_with_the_month(clock):
+    scheduler = QuotaScheduler(monthly_budget=3, backend=MemoryBackend())
+    assert [scheduler.try_acquire(0) for _ in range(4)] == [True, True, True, False]
+    clock[0] = datetime(2024, 11, 1, 0, 0, 1, tzinfo=timezone.utc).timestamp()
+    assert scheduler.try_acquire(0)
+    status = scheduler.status()
+    assert status['spent_month'] == 1
+    assert status['month_resets_at'] == '2024-12-01T00:00:00+00:00'
+
+
+def test_upstream_remaining_count_raises_spend(clock):
+    scheduler = QuotaScheduler(monthly_budget=100, backend=MemoryBackend())
+    scheduler.try_acquire(0)
+    scheduler.sync_remaining(40)
+    assert scheduler.status()['spent_month'] == 60
+    scheduler.sync_remaining(90)  # Never lowers the count
+    assert scheduler.status()['spent_month'] == 60
+
+
+def test_projected_exhaustion_within_the_month(clock):
+    scheduler = QuotaScheduler(monthly_budget=100, backend=MemoryBackend())
+    for _ in range(80):
+        scheduler.try_acquire(0)
+    assert scheduler.status()['projected_exhaustion'] is not None
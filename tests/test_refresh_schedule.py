@@ -0,0 +1,52 @@
+# tests/test_refresh_schedule.py
+import pytest
+from config import (LIVE_POLL_INTERVAL, PREGAME_POLL_INTERVAL, PREGAME_WINDOW, IDLE_POLL_INTERVAL,
+                    KICKOFF_LEAD)
+from refresh_schedule import client_interval_ms, next_poll_delay
+from week_index import WeekIndex, parse_timestamp
+
+KICKOFF = parse_timestamp('2024-09-08T17:00Z')
+HOUR = 60 * 60
+
+
+def _week_index(state='pre'):
+    return WeekIndex({
+        'leagues': [{'calendar': [{'entries': [
+            {'label': 'Week 1', 'startDate': '2024-09-04T07:00Z', 'endDate': '2024-09-11T06:59Z'},
+        ]}]}],
+        'events': [{'id': '1', 'date': '2024-09-08T17:00Z', 'status': {'type': {'state': state}}}],
+    })
+
+
+@pytest.mark.parametrize('now, state, expected', [
+    (KICKOFF - 10 * HOUR, 'pre', IDLE_POLL_INTERVAL),  # Idle sleeps are capped
+    (KICKOFF - 5 * HOUR, 'pre', 5 * HOUR - PREGAME_WINDOW),  # Wake as the pre-game window opens
+    (KICKOFF - 2 * HOUR, 'pre', PREGAME_POLL_INTERVAL),
+    (KICKOFF - 3 * 60, 'pre', 3 * 60 - KICKOFF_LEAD),  # Land the last pre-game poll before kickoff
+    (KICKOFF - 30, 'pre', LIVE_POLL_INTERVAL),
+    (KICKOFF + HOUR, 'pre', LIVE_POLL_INTERVAL),  # Kicked off, though the cached feed does not know yet
+    (KICKOFF + HOUR, 'post', IDLE_POLL_INTERVAL),  # Over, and no game left this season
+])
+def test_next_poll_delay(now, state, expected):
+    assert next_poll_delay(_week_index(state), now=now) == expected
+
+
+def test_next_poll_delay_while_scores_are_live_or_without_a_schedule():
+    assert next_poll_delay(_week_index(), scores_in_progress=True, now=KICKOFF - 10 * HOUR) == LIVE_POLL_INTERVAL
+    assert next_poll_delay(None, now=KICKOFF) == PREGAME_POLL_INTERVAL
+
+
+@pytest.mark.parametrize('now, next_poll_in, games_in_progress, expected', [
+    (KICKOFF - 10 * HOUR, 6 * HOUR, True, LIVE_POLL_INTERVAL),
+    (KICKOFF - 10 * HOUR, 6 * HOUR, False, 6 * HOUR),  # Follow the server's next poll
+    (KICKOFF - 5 * HOUR, 6 * HOUR, False, 5 * HOUR - PREGAME_WINDOW),  # Capped at the pre-game window
+    (KICKOFF - HOUR, PREGAME_POLL_INTERVAL, False, PREGAME_POLL_INTERVAL),
+    (KICKOFF - HOUR, 6 * HOUR, False, HOUR),  # Inside the window, capped at kickoff
+    (KICKOFF - HOUR, 0, False, LIVE_POLL_INTERVAL),  # Never faster than live polling
+])
+def test_client_interval_ms(now, next_poll_in, games_in_progress, expected):
+    assert client_interval_ms(now + next_poll_in, games_in_progress, _week_index(), now=now) == expected * 1000
+
+
+def test_client_interval_ms_without_a_schedule_follows_the_server():
+    assert client_interval_ms(KICKOFF + HOUR, now=KICKOFF) == HOUR * 1000
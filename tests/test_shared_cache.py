@@ -0,0 +1,60 @@
+# tests/test_shared_cache.py
+import threading
+import time
+import fakeredis
+import pytest
+from shared_cache import MemoryBackend, RedisBackend, SQLiteBackend
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'cache.sqlite3'))
+    return RedisBackend(fakeredis.FakeRedis())
+
+
+def test_get_returns_value_until_it_expires(backend):
+    now = time.time()
+    backend.set('fresh', {'a': 1}, now, 10, 60)
+    backend.set('expired', {'a': 2}, now - 120, 10, 60)
+    assert backend.get('fresh') == ({'a': 1}, pytest.approx(now), 10)
+    assert backend.get('expired') is None
+    backend.delete('fresh')
+    assert backend.get('fresh') is None
+
+
+def test_acquire_is_exclusive_until_released(backend):
+    token = backend.acquire('key', 30)
+    assert token is not None
+    assert backend.acquire('key', 30) is None
+    backend.release('key', 'not-the-token')
+    assert backend.acquire('key', 30) is None
+    backend.release('key', token)
+    assert backend.acquire('key', 30) is not None
+
+
+def test_acquire_takes_over_an_expired_lock(backend):
+    assert backend.acquire('key', 0.05) is not None
+    time.sleep(0.1)
+    assert backend.acquire('key', 30) is not None
+
+
+def test_transact_returns_result_and_stores_state(backend):
+    assert backend.transact('counter', lambda state: ({'n': 1}, 'first')) == 'first'
+    assert backend.transact('counter', lambda state: (state, state['n'])) == 1
+
+
+def test_transact_is_atomic_across_threads(backend):
+    def increment(state):
+        count = (state or 0) + 1
+        return count, count
+
+    threads = [threading.Thread(target=lambda: [backend.transact('counter', increment) for _ in range(25)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.transact('counter', lambda state: (state, state)) == 100
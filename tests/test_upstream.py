@@ -0,0 +1,174 @@
+# tests/test_upstream.py
+import threading
+import time
+import httpx
+import pytest
+import breaker
+import upstream
+from breaker import CircuitOpen
+from quota import QuotaExhausted, QuotaScheduler
+from shared_cache import MemoryBackend
+
+URL = 'https://upstream.test/endpoint'
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Route upstream.get() to a handler the test sets, with fresh breakers, budget and response history."""
+    state = {'handler': None, 'requests': []}
+
+    def handle(request):
+        state['requests'].append(request)
+        return state['handler'](request)
+
+    monkeypatch.setattr(upstream, '_client', httpx.Client(transport=httpx.MockTransport(handle)))
+    monkeypatch.setattr(upstream, '_last_responses', {})
+    monkeypatch.setattr(upstream, '_stale_served', (0, None))
+    monkeypatch.setattr(upstream, 'scheduler', QuotaScheduler())
+    monkeypatch.setattr(upstream, '_backoff_delay', lambda attempt, response=None: 0)
+    monkeypatch.setattr(breaker, '_breakers', {})
+    return state
+
+
+def _limit_budget(monkeypatch, requests):
+    """Allow only this many more upstream requests."""
+    scheduler = QuotaScheduler(daily_budget=requests + 1, backend=MemoryBackend())
+    scheduler.try_acquire()  # A daily budget of 0 would mean unlimited
+    monkeypatch.setattr(upstream, 'scheduler', scheduler)
+    monkeypatch.setattr(upstream, 'UPSTREAM_QUOTA_RESERVES', {URL: 0})
+
+
+def test_identical_concurrent_calls_share_one_request(transport):
+    release = threading.Event()
+
+    def slow(request):
+        release.wait(5)
+        return httpx.Response(200, json={'ok': True})
+
+    transport['handler'] = slow
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(upstream.get(URL, {'day': 1}))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(transport['requests']) == 1
+    assert [response.json() for response in results] == [{'ok': True}] * 5
+
+
+def test_every_retry_is_charged_to_the_quota(transport):
+    statuses = [503, 502, 200]
+    transport['handler'] = lambda request: httpx.Response(statuses.pop(0), json={})
+    assert upstream.get(URL).status_code == 200
+    assert upstream.scheduler.status()['spent_month'] == 3
+
+
+def test_a_refused_retry_returns_the_last_error_response(transport, monkeypatch):
+    _limit_budget(monkeypatch, 1)
+    transport['handler'] = lambda request: httpx.Response(503)
+    assert upstream.get(URL).status_code == 503
+    assert len(transport['requests']) == 1
+
+
+def test_a_refused_request_without_history_raises(transport, monkeypatch):
+    _limit_budget(monkeypatch, 0)
+    with pytest.raises(QuotaExhausted):
+        upstream.get(URL)
+
+
+def test_quota_refusals_serve_the_last_response_marked_stale(transport, monkeypatch):
+    transport['handler'] = lambda request: httpx.Response(200, json={'score': 7})
+    upstream.get(URL)
+    _limit_budget(monkeypatch, 0)
+    response = upstream.get(URL)
+    assert response.json() == {'score': 7}
+    assert response.headers[upstream.STALE_HEADER] == 'quota'
+    assert upstream.stale_reason() == 'quota'
+
+
+def _open_breaker():
+    endpoint_breaker = breaker.get_breaker('/endpoint')
+    while endpoint_breaker.state == breaker.CLOSED:
+        assert endpoint_breaker.allow()
+        endpoint_breaker.record(False)
+
+
+def test_an_open_breaker_serves_the_last_response_marked_stale(transport):
+    transport['handler'] = lambda request: httpx.Response(200, json={'score': 7})
+    upstream.get(URL)
+    _open_breaker()
+    response = upstream.get(URL)
+    assert response.json() == {'score': 7}
+    assert response.headers[upstream.STALE_HEADER] == 'circuit'
+    assert len(transport['requests']) == 1
+
+
+def test_an_open_breaker_without_history_raises(transport):
+    _open_breaker()
+    with pytest.raises(CircuitOpen):
+        upstream.get(URL)
+
+
+def test_failed_attempts_serve_the_last_response_marked_stale(transport):
+    transport['handler'] = lambda request: httpx.Response(200, json={'score': 7})
+    upstream.get(URL)
+    transport['handler'] = lambda request: httpx.Response(500)
+    response = upstream.get(URL)
+    assert response.json() == {'score': 7}
+    assert response.headers[upstream.STALE_HEADER] == 'error'
+
+
+def test_transport_errors_serve_the_last_response_marked_stale(transport):
+    transport['handler'] = lambda request: httpx.Response(200, json={'score': 7})
+    upstream.get(URL)
+
+    def unreachable(request):
+        raise httpx.ConnectError("refused")
+
+    transport['handler'] = unreachable
+    response = upstream.get(URL)
+    assert response.json() == {'score': 7}
+    assert response.headers[upstream.STALE_HEADER] == 'error'
+
+
+def test_transport_errors_without_history_are_raised(transport):
+    def unreachable(request):
+        raise httpx.ConnectError("refused")
+
+    transport['handler'] = unreachable
+    with pytest.raises(httpx.ConnectError):
+        upstream.get(URL)
+    assert len(transport['requests']) == upstream.UPSTREAM_RETRIES + 1
+
+
+def test_a_slow_request_is_raced_by_one_duplicate(transport, monkeypatch):
+    monkeypatch.setattr(upstream, 'UPSTREAM_HEDGE_AFTER', {URL: 0.05})
+
+    def first_is_slow(request):
+        if len(transport['requests']) == 1:
+            time.sleep(0.5)
+            return httpx.Response(200, json={'from': 'first'})
+        return httpx.Response(200, json={'from': 'duplicate'})
+
+    transport['handler'] = first_is_slow
+    started = time.monotonic()
+    response = upstream.get(URL)
+    assert response.json() == {'from': 'duplicate'}
+    assert time.monotonic() - started < 0.5
+    assert len(transport['requests']) == 2
+
+
+def test_not_modified_is_answered_from_the_last_response(transport):
+    def conditional(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304, headers={'ETag': '"v1"'})
+        return httpx.Response(200, json={'score': 7}, headers={'ETag': '"v1"'})
+
+    transport['handler'] = conditional
+    upstream.get(URL)
+    response = upstream.get(URL)
+    assert transport['requests'][1].headers['If-None-Match'] == '"v1"'
+    assert response.status_code == 200
+    assert response.json() == {'score': 7}
@@ -0,0 +1,78 @@
+# tests/test_warmup.py
+import time
+import pytest
+import warmup
+from cache import TTLCache
+from config import NFL_SEASON
+from odds_store import OddsStore
+from poller import ScoreboardPoller
+from shared_cache import MemoryBackend
+
+FEED = {'events': [{'id': '1'}]}
+SCOREBOARD = {'events': [{'id': '1', 'competitions': [{
+    'competitors': [{'team': {'displayName': 'Home'}, 'score': '7'},
+                    {'team': {'displayName': 'Away'}, 'score': '3'}],
+    'status': {'period': 2, 'displayClock': '4:12', 'type': {'description': 'In Progress', 'state': 'in'}},
+}]}]}
+
+
+@pytest.fixture
+def fresh_state(tmp_path, monkeypatch):
+    """Point warmup at empty caches, odds store and poller, as in a newly started process."""
+    def reset():
+        monkeypatch.setattr(warmup, 'events_cache', TTLCache(60, name='season'))
+        monkeypatch.setattr(warmup, 'odds_cache', TTLCache(60, name='odds'))
+        monkeypatch.setattr(warmup, 'odds_store', OddsStore(str(tmp_path / f'odds-{time.monotonic()}.jsonl')))
+        monkeypatch.setattr(warmup, 'scoreboard_poller',
+                            ScoreboardPoller(lambda: None, lambda: 60, backend=MemoryBackend()))
+    reset()
+    return reset
+
+
+def _save(path, saved_at, monkeypatch):
+    warmup.events_cache.set(NFL_SEASON, FEED)
+    warmup.odds_cache.set('1', {'spread': 'KC -3.5'})
+    warmup.odds_store.set('1', 'KC -3.5')
+    warmup.scoreboard_poller.restore(SCOREBOARD)
+    with monkeypatch.context() as patch:
+        patch.setattr(warmup.time, 'time', lambda: saved_at)
+        assert warmup.save_snapshot(str(path))
+
+
+def test_restores_what_was_saved(tmp_path, fresh_state, monkeypatch):
+    path = tmp_path / 'snapshot' / warmup.SNAPSHOT_FILE
+    _save(path, time.time(), monkeypatch)
+    fresh_state()
+
+    assert warmup.restore_snapshot(str(path)) < 60
+    assert warmup.events_cache.peek(NFL_SEASON) == FEED
+    assert warmup.odds_cache.peek('1') == {'spread': 'KC -3.5'}
+    assert warmup.odds_store.get('1') == 'KC -3.5'
+    assert warmup.scoreboard_poller.snapshot()['feed'] == SCOREBOARD
+
+
+def test_seeded_feed_is_served_however_old(tmp_path, fresh_state, monkeypatch):
+    path = tmp_path / warmup.SNAPSHOT_FILE
+    _save(path, time.time() - 30 * 24 * 3600, monkeypatch)
+    fresh_state()
+
+    warmup.restore_snapshot(str(path))
+    # Served at once while the reload runs in the background
+    assert warmup.events_cache.get(NFL_SEASON, lambda: {'events': []}) == FEED
+
+
+def test_old_scoreboard_is_not_restored(tmp_path, fresh_state, monkeypatch):
+    path = tmp_path / warmup.SNAPSHOT_FILE
+    _save(path, time.time() - warmup.SCOREBOARD_MAX_AGE - 1, monkeypatch)
+    fresh_state()
+
+    warmup.restore_snapshot(str(path))
+    assert warmup.events_cache.peek(NFL_SEASON) == FEED
+    assert warmup.scoreboard_poller.snapshot()['version'] == 0
+
+
+def test_missing_or_unreadable_snapshots_are_ignored(tmp_path, fresh_state):
+    assert warmup.restore_snapshot(str(tmp_path / 'missing.json.gz')) is None
+    path = tmp_path / 'broken.json.gz'
+    path.write_bytes(b'not gzip')
+    assert warmup.restore_snapshot(str(path)) is None
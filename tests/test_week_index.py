@@ -0,0 +1,43 @@
+# tests/test_week_index.py
+from week_index import WeekIndex, parse_timestamp
+
+FEED = {
+    'leagues': [{'calendar': [
+        {'entries': [{'label': 'Week 1', 'startDate': '2024-09-04T07:00Z', 'endDate': '2024-09-11T06:59Z'}]},
+        {'entries': [{'label': 'Week 2', 'startDate': '2024-09-11T07:00Z', 'endDate': '2024-09-18T06:59Z'}]},
+    ]}],
+    'events': [
+        {'id': 'preseason', 'date': '2024-09-04T06:59Z'},
+        {'id': 'week-1-start', 'date': '2024-09-04T07:00Z'},
+        {'id': 'week-1', 'date': '2024-09-08T17:00Z'},
+        {'id': 'week-1-end', 'date': '2024-09-11T06:59Z'},
+        {'id': 'week-2-start', 'date': '2024-09-11T07:00Z'},
+    ],
+}
+
+
+def test_week_bounds_are_inclusive():
+    week_index = WeekIndex(FEED)
+    assert week_index.week_at(parse_timestamp('2024-09-04T06:59Z')) is None
+    assert week_index.week_at(parse_timestamp('2024-09-04T07:00Z')) == 0
+    assert week_index.week_at(parse_timestamp('2024-09-11T06:59Z')) == 0
+    assert week_index.week_at(parse_timestamp('2024-09-11T07:00Z')) == 1
+    assert week_index.week_at(parse_timestamp('2024-09-18T07:00Z')) is None
+
+
+def test_events_for_week_match_the_calendar():
+    week_index = WeekIndex(FEED)
+    assert [event['id'] for event in week_index.events_for_week(0)] == ['week-1-start', 'week-1', 'week-1-end']
+    assert [event['id'] for event in week_index.events_for_week(1)] == ['week-2-start']
+    assert week_index.events_for_week(2) is None
+    assert week_index.events_for_week(None) is None
+    assert [option['label'] for option in week_index.options] == ['Week 1: 09/04 - 09/11', 'Week 2: 09/11 - 09/18']
+
+
+def test_kickoff_lookups():
+    week_index = WeekIndex(FEED)
+    kickoff = parse_timestamp('2024-09-08T17:00Z')
+    assert week_index.next_kickoff(kickoff - 1) == kickoff
+    assert week_index.next_kickoff(parse_timestamp('2024-09-11T07:00Z')) is None
+    assert [event['id'] for event in week_index.events_between(kickoff, parse_timestamp('2024-09-11T06:59Z'))] == [
+        'week-1', 'week-1-end']
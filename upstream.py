@@ -0,0 +1,226 @@
+# upstream.py
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlsplit
+import httpx
+from breaker import CircuitOpen, any_open, get_breaker
+from config import (HEADERS, UPSTREAM_TIMEOUTS, UPSTREAM_MAX_CONNECTIONS, UPSTREAM_RETRIES, UPSTREAM_BACKOFF,
+                    UPSTREAM_BACKOFF_MAX, UPSTREAM_MODE, UPSTREAM_QUOTA_RESERVES, UPSTREAM_HEDGE_AFTER)
+import replay
+from metrics import UPSTREAM_COALESCED, UPSTREAM_HEDGES, UPSTREAM_STALE_SERVED, observe_upstream
+from quota import QuotaExhausted, scheduler
+
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) for URLs without an entry in UPSTREAM_TIMEOUTS
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_QUOTA_RESERVE = 0.5  # For URLs without an entry in UPSTREAM_QUOTA_RESERVES
+STALE_HEADER = 'X-Upstream-Stale'  # Set on cached responses served in place of a request, with the reason
+STALE_NOTICE_WINDOW = 5 * 60  # Seconds after serving a stale response during which data is reported as stale
+
+_client = None
+_client_lock = threading.Lock()
+
+# Last 200 response per (url, params) and when it was received, used to revalidate with its
+# ETag or Last-Modified validator and to stand in for requests that cannot be sent or failed
+_last_responses = {}
+_last_responses_lock = threading.Lock()
+
+_stale_served = (0, None)  # (time, reason) of the last stale response served
+
+# Runs requests that may be hedged, so a slow one can be raced without blocking the caller
+_hedge_executor = ThreadPoolExecutor(max_workers=UPSTREAM_MAX_CONNECTIONS, thread_name_prefix='upstream')
+
+# Future for each (url, params) request currently in flight, shared by identical concurrent calls
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared keep-alive HTTP/2 client used for every upstream call."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                headers=HEADERS,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=UPSTREAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=UPSTREAM_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            )
+        return _client
+
+
+def _backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header when present."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), UPSTREAM_BACKOFF_MAX)
+    return random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF * 2 ** attempt))
+
+
+def _request_key(url, params):
+    return url, tuple(sorted((name, str(value)) for name, value in (params or {}).items()))
+
+
+def _conditional_headers(cached):
+    """Return If-None-Match / If-Modified-Since headers revalidating a cached response."""
+    headers = {}
+    if cached is not None:
+        if 'ETag' in cached.headers:
+            headers['If-None-Match'] = cached.headers['ETag']
+        if 'Last-Modified' in cached.headers:
+            headers['If-Modified-Since'] = cached.headers['Last-Modified']
+    return headers
+
+
+def _revalidated(key, cached, response):
+    """Swap a 304 for the cached response and remember new 200 responses."""
+    if response.status_code == 304 and cached is not None:
+        response = cached
+    if response.status_code == 200:
+        with _last_responses_lock:
+            _last_responses[key] = (response, time.time())
+    return response
+
+
+def _stale_response(key, endpoint, reason):
+    """Return the last response for key marked stale with its age and reason, or None if there is none."""
+    global _stale_served
+    with _last_responses_lock:
+        cached, received_at = _last_responses.get(key, (None, None))
+    if cached is None:
+        return None
+    _stale_served = (time.time(), reason)
+    UPSTREAM_STALE_SERVED.labels(endpoint, reason).inc()
+    # The stored content is already decoded, so drop the headers that describe the wire encoding
+    headers = [(name, value) for name, value in cached.headers.items()
+               if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')]
+    headers += [('Age', str(int(time.time() - received_at))), (STALE_HEADER, reason)]
+    return httpx.Response(cached.status_code, headers=headers, content=cached.content, request=cached.request)
+
+
+def stale_reason():
+    """Return why data may be out of date ('quota', 'circuit' or 'error'), or None when upstream is healthy."""
+    served_at, reason = _stale_served
+    if time.time() - served_at < STALE_NOTICE_WINDOW:
+        return reason
+    if any_open():
+        return 'circuit'
+    if scheduler.rationing():
+        return 'quota'
+    return None
+
+
+def get(url, params=None):
+    """GET an upstream URL, sharing one in-flight request between identical concurrent calls."""
+    key = _request_key(url, params)
+    with _in_flight_lock:
+        pending = _in_flight.get(key)
+        if pending is None:
+            pending = _in_flight[key] = Future()
+            leader = True
+        else:
+            leader = False
+
+    if not leader:
+        UPSTREAM_COALESCED.labels(urlsplit(url).path).inc()
+        return pending.result()
+
+    try:
+        pending.set_result(_get(url, params, key))
+    except BaseException as e:
+        pending.set_exception(e)
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+    return pending.result()
+
+
+def _get(url, params, key):
+    """GET an upstream URL with retries, hedging, revalidation and stale fallbacks."""
+    connect_timeout, read_timeout = UPSTREAM_TIMEOUTS.get(url, DEFAULT_TIMEOUT)
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+    endpoint = urlsplit(url).path
+    reserve = UPSTREAM_QUOTA_RESERVES.get(url, DEFAULT_QUOTA_RESERVE)
+    breaker = get_breaker(endpoint)
+    with _last_responses_lock:
+        cached, _ = _last_responses.get(key, (None, None))
+    headers = _conditional_headers(cached)
+
+    def acquire():
+        """Return None if the breaker and the quota allow one more request, else why not."""
+        if not breaker.allow():
+            return 'circuit'
+        if not scheduler.try_acquire(reserve, endpoint):
+            breaker.cancel()
+            return 'quota'
+        return None
+
+    def send():
+        started = time.perf_counter()
+        try:
+            response = get_client().get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.TransportError:
+            observe_upstream(endpoint, started)
+            breaker.record(False)
+            raise
+        except BaseException:
+            breaker.cancel()
+            raise
+        observe_upstream(endpoint, started, response)
+        breaker.record(response.status_code not in RETRY_STATUSES)
+        remaining = response.headers.get('x-ratelimit-requests-remaining')
+        if remaining and remaining.isdigit():
+            scheduler.sync_remaining(int(remaining))
+        if UPSTREAM_MODE == 'record':
+            # Record what the caller gets, so a 304 is replayed as the body it revalidated
+            resolved = cached if response.status_code == 304 and cached is not None else response
+            replay.record(url, params, resolved, time.perf_counter() - started)
+        return response
+
+    response = None
+    for attempt in range(UPSTREAM_RETRIES + 1):
+        refused = acquire()
+        if refused:
+            stale = _stale_response(key, endpoint, refused)
+            if stale is not None:
+                return stale
+            if response is not None:
+                return response  # No budget or breaker left for retries; hand back the last error response
+            if refused == 'quota':
+                raise QuotaExhausted(f"Upstream quota exhausted for {endpoint}")
+            raise CircuitOpen(f"Circuit open for {endpoint}")
+        response = None
+        try:
+            response = _hedged(send, acquire, UPSTREAM_HEDGE_AFTER.get(url, 0), endpoint)
+            if response.status_code not in RETRY_STATUSES:
+                return _revalidated(key, cached, response)
+        except httpx.TransportError:
+            if attempt == UPSTREAM_RETRIES:
+                stale = _stale_response(key, endpoint, 'error')
+                if stale is not None:
+                    return stale
+                raise
+        if attempt == UPSTREAM_RETRIES:
+            stale = _stale_response(key, endpoint, 'error')
+            return stale if stale is not None else response
+        time.sleep(_backoff_delay(attempt, response))
+
+
+def _hedged(send, acquire, hedge_after, endpoint):
+    """Return send()'s response, racing one duplicate if the first takes longer than hedge_after."""
+    if not hedge_after:
+        return send()
+    first = _hedge_executor.submit(send)
+    done, _ = wait([first], timeout=hedge_after)
+    if done or acquire() is not None:
+        return first.result()
+    UPSTREAM_HEDGES.labels(endpoint).inc()
+    second = _hedge_executor.submit(send)
+    for future in as_completed([first, second]):
+        if future.exception() is None:
+            return future.result()
+    return first.result()
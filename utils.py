@@ -1,72 +1,209 @@
 # utils.py
-import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dash import dcc, html
-import requests
+import httpx
 import pytz
 from datetime import datetime, timezone
-from config import HEADERS, NFL_EVENTS_URL, ODDS_URL, SCOREBOARD_URL, ODDS_FILE_PATH, SCORING_PLAYS_URL
+from cache import TTLCache, Uncached
+from shared_cache import backend as shared_backend
+import upstream
+from logos import logo_url
+from metrics import ODDS_STORE_LOOKUPS
+from odds_store import OddsStore
+from week_index import WeekIndex
+from refresh_schedule import game_state
+from config import (NFL_EVENTS_URL, ODDS_URL, SCOREBOARD_URL, ODDS_FILE_PATH, ODDS_LOG_PATH, SCORING_PLAYS_URL,
+                    NFL_SEASON, EVENTS_CACHE_TTL, EVENTS_CACHE_STALE_TTL, ODDS_MAX_WORKERS,
+                    SCORING_PLAYS_LIVE_TTL, SCOREBOARD_CACHE_TTL, ODDS_CACHE_TTL)
 
-def save_last_fetched_odds(last_fetched_odds):
-    """Save the last fetched odds to a JSON file."""
-    with open(ODDS_FILE_PATH, 'w') as f:
-        json.dump(last_fetched_odds, f)
+logger = logging.getLogger(__name__)
 
-def load_last_fetched_odds():
-    """Load the last fetched odds from a JSON file."""
+# Every cache below is backed by shared_backend, so adding workers does not add upstream calls
+
+# Season feed, shared by the Dash callbacks and the FastAPI endpoints
+events_cache = TTLCache(EVENTS_CACHE_TTL, stale_ttl=EVENTS_CACHE_STALE_TTL, name='season', backend=shared_backend)
+
+# Scoring plays keyed by game ID; final games are stored without expiry
+scoring_plays_cache = TTLCache(SCORING_PLAYS_LIVE_TTL, name='scoring_plays', backend=shared_backend)
+
+# Day's scoreboard keyed by date, read by each worker's poller
+scoreboard_cache = TTLCache(SCOREBOARD_CACHE_TTL, name='scoreboard', backend=shared_backend)
+
+# ESPN BET line per game ID as last fetched upstream (None when there is none)
+odds_cache = TTLCache(ODDS_CACHE_TTL, name='odds', backend=shared_backend)
+
+# Week index for the season feed currently in events_cache, rebuilt only when the feed is refreshed
+_week_index = (None, None)  # (feed, WeekIndex)
+_week_index_lock = threading.Lock()
+
+# Process-wide odds index, persisted to an append-only log
+odds_store = OddsStore(ODDS_LOG_PATH, legacy_path=ODDS_FILE_PATH)
+
+# Shared pool so concurrent week renders across sessions stay within ODDS_MAX_WORKERS upstream calls
+_odds_executor = ThreadPoolExecutor(max_workers=ODDS_MAX_WORKERS, thread_name_prefix='odds')
+
+def _cacheable(response, value):
+    """Return value, wrapped in Uncached if response is a stale fallback so no cache keeps it as fresh."""
+    if upstream.STALE_HEADER in response.headers:
+        return Uncached(value)
+    return value
+
+def _request_nfl_events():
+    """Request the full season feed from RapidAPI, raising on failure so it is never cached."""
+    querystring = {"year": NFL_SEASON}
+    response = upstream.get(NFL_EVENTS_URL, params=querystring)
+    response.raise_for_status()
+    return _cacheable(response, response.json())
+
+def fetch_nfl_events():
+    """Fetch NFL events data from the shared season cache."""
     try:
-        with open(ODDS_FILE_PATH, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+        return events_cache.get(NFL_SEASON, _request_nfl_events)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Failed to fetch NFL events: %s", e)
         return {}
 
-def fetch_nfl_events():
-    """Fetch NFL events data."""
-    querystring = {"year": "2024"}
-    response = requests.get(NFL_EVENTS_URL, headers=HEADERS, params=querystring)
-    return response.json() if response.status_code == 200 else {}
+def get_week_index():
+    """Return the WeekIndex for the cached season feed, or None if the feed is unavailable."""
+    global _week_index
+    feed = fetch_nfl_events()
+    if not feed:
+        return None
+    with _week_index_lock:
+        indexed_feed, index = _week_index
+        if indexed_feed is not feed:
+            index = WeekIndex(feed)
+            _week_index = (feed, index)
+    return index
 
-def fetch_espn_bet_odds(game_id, game_status, last_fetched_odds):
+def _request_odds(game_id):
+    """Request a game's ESPN BET line, or None if it has none, raising on failure so it is never cached."""
+    response = upstream.get(ODDS_URL, params={"id": game_id})
+    response.raise_for_status()
+    details = None
+    for item in response.json().get('items', []):
+        if item.get('provider', {}).get('id') == "58":  # ESPN BET Provider ID
+            details = item.get('details', 'N/A')
+            break
+    return _cacheable(response, details)
+
+def fetch_espn_bet_odds(game_id, game_status, odds_store):
     """Fetch ESPN BET odds based on game status."""
-    if game_status == 'Scheduled':
-        # print(f"Fetching ESPN BET odds for scheduled game ID: {game_id}")
-        querystring = {"id": game_id}
-        response = requests.get(ODDS_URL, headers=HEADERS, params=querystring)
-        odds_data = response.json()
-
-        for item in odds_data.get('items', []):
-            if item.get('provider', {}).get('id') == "58":  # ESPN BET Provider ID
-                last_fetched_odds[game_id] = item.get('details', 'N/A')  # Store the fetched odds
-                save_last_fetched_odds(last_fetched_odds)  # Save to file
-                return item.get('details', 'N/A')
-    elif game_id not in last_fetched_odds:
-        # Odds not available in the dictionary, fetch odds regardless of the game status
-        # print(f"Fetching ESPN BET odds for game ID: {game_id} as it is not in last fetched odds.")
-        querystring = {"id": game_id}
-        response = requests.get(ODDS_URL, headers=HEADERS, params=querystring)
-        odds_data = response.json()
-
-        for item in odds_data.get('items', []):
-            if item.get('provider', {}).get('id') == "58":  # ESPN BET Provider ID
-                last_fetched_odds[game_id] = item.get('details', 'N/A')  # Store the fetched odds
-                save_last_fetched_odds()  # Save to file
-                return item.get('details', 'N/A')
-    else:
+    if game_status != 'Scheduled' and game_id in odds_store:
         # Return the last fetched odds if the game is in progress or final
-        # print(f"Returning last fetched odds for game ID: {game_id}")
-        return last_fetched_odds[game_id]  # Return last fetched odds if available
+        ODDS_STORE_LOOKUPS.labels('hit').inc()
+        return odds_store.get(game_id)
+
+    ODDS_STORE_LOOKUPS.labels('miss').inc()
+    # Fetch live odds for scheduled games, or for any game we have no odds for yet
+    try:
+        odds = odds_cache.get(game_id, lambda: _request_odds(game_id))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Failed to fetch odds: %s", e, extra={'game_id': game_id})
+        odds = None
+    if odds is not None:
+        odds_store.set(game_id, odds)  # Store the fetched odds
+        return odds
+
+    return odds_store.get(game_id)  # Fall back to the last fetched odds, if any
+
+def fetch_week_odds(events, odds_store):
+    """Resolve odds for every event in a week as one concurrent batch, keyed by game ID."""
+    def fetch(event):
+        game_id = event.get('id')
+        game_status = event['status']['type']['description']
+        try:
+            return game_id, fetch_espn_bet_odds(game_id, game_status, odds_store)
+        except Exception as e:
+            logger.warning("Failed to resolve odds: %s", e, extra={'game_id': game_id})
+            return game_id, odds_store.get(game_id)
+
+    return dict(_odds_executor.map(fetch, events))
 
-    return None  # Return None if no odds are found
+def _request_games_by_day(day):
+    """Request the scoreboard for a day from RapidAPI, raising on failure so it is never cached."""
+    response = upstream.get(SCOREBOARD_URL, params={"day": day})
+    response.raise_for_status()
+    return _cacheable(response, response.json())
 
 def fetch_games_by_day():
     """Fetch game data for all games on a specific day."""
     today = datetime.now().strftime('%Y%m%d')
-    querystring = {"day": today}
-    response = requests.get(SCOREBOARD_URL, headers=HEADERS, params=querystring)
-    return response.json() if response.status_code == 200 else {}
+    try:
+        return scoreboard_cache.get(today, lambda: _request_games_by_day(today))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Failed to fetch games: %s", e)
+        return {}
+
+
+def possession_side(competition):
+    """Return 'home' or 'away' for the team with the ball, or None."""
+    possession_team_id = competition.get('situation', {}).get('possession')
+    if not possession_team_id:
+        return None
+    if possession_team_id == competition['competitors'][0]['team']['id']:
+        return 'home'
+    if possession_team_id == competition['competitors'][1]['team']['id']:
+        return 'away'
+    return None
+
+
+def extract_scores(games_data):
+    """Return the per-game score dicts of a scoreboard response and whether any game is in progress."""
+    updated_scores_data = []
+    games_in_progress = False
+    debug = logger.isEnabledFor(logging.DEBUG)  # Per-game dumps cost nothing unless enabled
 
+    for game in games_data.get('events', []):
+        game_id = game.get('id')
+        competitions = game.get('competitions', [])
 
-def extract_game_info(event, last_fetched_odds):
-    """Extract all relevant game information from an event."""
+        if not competitions:
+            logger.info("No competitions found", extra={'game_id': game_id})
+            continue
+
+        home_team = competitions[0]['competitors'][0]['team']['displayName']
+        away_team = competitions[0]['competitors'][1]['team']['displayName']
+        home_score = competitions[0]['competitors'][0].get('score', 'N/A')
+        away_score = competitions[0]['competitors'][1].get('score', 'N/A')
+
+        status_info = competitions[0].get('status', {})
+        quarter = status_info.get('period', 'N/A')
+        time_remaining = status_info.get('displayClock', 'N/A')
+        game_status = status_info.get('type', {}).get('description', 'N/A')
+
+        situation = competitions[0].get('situation', {})
+        possession = situation.get('downDistanceText', 'N/A')
+        possession_team = situation.get('possessionText', 'N/A')
+
+        if debug:
+            logger.debug("%s %s - %s %s, Q%s %s, %s", home_team, home_score, away_team, away_score, quarter,
+                         time_remaining, possession, extra={'game_id': game_id, 'possession_team': possession_team})
+
+        if game_state(competitions[0]) == 'in':  # Includes halftime and end-of-quarter breaks
+            games_in_progress = True
+
+        updated_scores_data.append({
+            'game_id': game_id,
+            'Home Team': home_team,
+            'Away Team': away_team,
+            'Home Team Score': home_score,
+            'Away Team Score': away_score,
+            'Quarter': quarter,
+            'Time Remaining': time_remaining,
+            'Down Distance': possession,
+            'Possession': possession_team,
+            'Game Status': game_status,
+            'Possession Side': possession_side(competitions[0]),
+        })
+
+    return updated_scores_data, games_in_progress
+
+
+def extract_game_info(event, odds):
+    """Extract all relevant game information from an event and its pre-fetched odds."""
     eastern = pytz.timezone("America/New_York")
     event_start_utc = datetime.fromisoformat(event['date'][:-1]).replace(tzinfo=timezone.utc)
     event_start_est = event_start_utc.astimezone(eastern)
@@ -78,10 +215,6 @@ def extract_game_info(event, last_fetched_odds):
     # Get the game status (e.g., Scheduled, In Progress, Final)
     game_status = event['status']['type']['description']
 
-    # Fetch odds based on game status (fetch live odds if scheduled, retain last odds otherwise)
-    game_id = event.get('id')
-    odds = fetch_espn_bet_odds(game_id, game_status, last_fetched_odds)
-
     # Extract overall records from the statistics
     home_team_record = event['competitions'][0]['competitors'][0]['records'][0]['summary']
     away_team_record = event['competitions'][0]['competitors'][1]['records'][0]['summary']
@@ -92,8 +225,8 @@ def extract_game_info(event, last_fetched_odds):
         'Home Team Score': event['competitions'][0]['competitors'][0].get('score', 'N/A'),
         'Away Team Score': event['competitions'][0]['competitors'][1].get('score', 'N/A'),
         'Odds': odds,
-        'Home Team Logo': home_team.get('logo'),
-        'Away Team Logo': away_team.get('logo'),
+        'Home Team Logo': logo_url(home_team.get('logo'), 60),
+        'Away Team Logo': logo_url(away_team.get('logo'), 60),
         'Home Team Color': f"#{home_team.get('color', '000000')}",
         'Away Team Color': f"#{away_team.get('color', '000000')}",
         'Venue': event['competitions'][0]['venue']['fullName'],
@@ -104,39 +237,56 @@ def extract_game_info(event, last_fetched_odds):
         'Quarter': event.get('status', {}).get('period', None),
         'Time Remaining': event.get('status', {}).get('displayClock', None),
         'Home Team Record': home_team_record,  # Added home team record
-        'Away Team Record': away_team_record  # Added away team record
+        'Away Team Record': away_team_record,  # Added away team record
+        'Down Distance': event['competitions'][0].get('situation', {}).get('downDistanceText', ''),
+        'Possession Side': possession_side(event['competitions'][0]),
     }
 
 
+def _request_scoring_plays(game_id):
+    """Request a game's scoring plays from RapidAPI, raising on failure so it is never cached."""
+    querystring = {"id": game_id}
+    response = upstream.get(SCORING_PLAYS_URL, params=querystring)
+    response.raise_for_status()
+    return _cacheable(response, response.json().get('scoringPlays', []))
+
+
+def fetch_scoring_plays(game_id, final=False):
+    """Fetch a game's scoring plays, or None if they cannot be fetched."""
+    ttl = float('inf') if final else None
+    try:
+        return scoring_plays_cache.get(game_id, lambda: _request_scoring_plays(game_id), ttl=ttl)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Failed to fetch scoring plays: %s", e, extra={'game_id': game_id})
+        return None
+
+
+def format_scoring_plays(scoring_plays):
+    """Format scoring plays as HTML components."""
+    formatted_scoring_plays = []
+
+    # Iterate over the list of scoring plays
+    for play in scoring_plays:
+        team_logo = logo_url(play['team'].get('logo', ''), 30)
+        period = play.get('period', {}).get('number', '')
+        clock = play.get('clock', {}).get('displayValue', '')
+        text = play.get('text', '')
+        away_score = play.get('awayScore', 'N/A')
+        home_score = play.get('homeScore', 'N/A')
+
+        # Format each scoring play for display
+        formatted_play = html.Div([
+            html.Img(src=team_logo, height="30px", style={'margin-right': '10px'}),
+            html.Span(f"Q{period} {clock} - "),
+            html.Span(text),
+            html.Span(f" ({away_score} - {home_score})", style={'margin-left': '10px'})
+        ], style={'display': 'flex', 'align-items': 'center'})
+
+        formatted_scoring_plays.append(formatted_play)
+
+    return formatted_scoring_plays
+
+
 def get_scoring_plays(game_id):
     """Fetch and return formatted scoring plays as HTML components."""
-    querystring = {"id": game_id}
-    response = requests.get(SCORING_PLAYS_URL, headers=HEADERS, params=querystring)
-
-    if response.status_code == 200:
-        scoring_data = response.json()
-        scoring_plays = scoring_data.get('scoringPlays', [])
-        formatted_scoring_plays = []
-
-        # Iterate over the list of scoring plays
-        for play in scoring_plays:
-            team_logo = play['team'].get('logo', '')
-            period = play.get('period', {}).get('number', '')
-            clock = play.get('clock', {}).get('displayValue', '')
-            text = play.get('text', '')
-            away_score = play.get('awayScore', 'N/A')
-            home_score = play.get('homeScore', 'N/A')
-
-            # Format each scoring play for display
-            formatted_play = html.Div([
-                html.Img(src=team_logo, height="30px", style={'margin-right': '10px'}),
-                html.Span(f"Q{period} {clock} - "),
-                html.Span(text),
-                html.Span(f" ({away_score} - {home_score})", style={'margin-left': '10px'})
-            ], style={'display': 'flex', 'align-items': 'center'})
-
-            formatted_scoring_plays.append(formatted_play)
-
-        return formatted_scoring_plays
-    else:
-        return []  # Return an empty list if the API call fails
+    return format_scoring_plays(fetch_scoring_plays(game_id) or [])
@@ -0,0 +1,108 @@
+# warmup.py
+"""Warm start for freshly started processes from snapshots in SNAPSHOT_DIR."""
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from config import NFL_SEASON, SNAPSHOT_DIR, SNAPSHOT_INTERVAL
+from poller import scoreboard_poller
+from utils import events_cache, odds_cache, odds_store, fetch_week_odds, get_week_index
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.json.gz'
+SCOREBOARD_MAX_AGE = 10 * 60  # Oldest saved scoreboard published at boot; live scores go stale fast
+
+
+def save_snapshot(path):
+    """Atomically write the season feed, odds and current scoreboard to path, if the feed is loaded."""
+    feed = events_cache.peek(NFL_SEASON)
+    if not feed:
+        return False
+    snapshot = {
+        'saved_at': time.time(),
+        'season': NFL_SEASON,
+        'feed': feed,
+        'odds': dict(odds_store.items()),
+        'odds_lines': {game_id: [odds, fetched_at] for game_id, odds, fetched_at in odds_cache.items()},
+        'scoreboard': scoreboard_poller.snapshot()['feed'],
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Workers sharing the directory each write their own
+    with gzip.open(tmp_path, 'wt', compresslevel=5) as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    return True
+
+
+def restore_snapshot(path):
+    """Seed the caches, odds store and scoreboard poller from path; return the snapshot's age or None."""
+    try:
+        with gzip.open(path, 'rt') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+        return None
+    if snapshot.get('season') != NFL_SEASON:
+        return None
+
+    saved_at = snapshot['saved_at']
+    events_cache.seed(NFL_SEASON, snapshot['feed'], saved_at)
+    for game_id, (odds, fetched_at) in snapshot.get('odds_lines', {}).items():
+        odds_cache.seed(game_id, odds, fetched_at)
+    odds_store.update(snapshot.get('odds', {}))
+    # The scoreboard is the day's (see utils.fetch_games_by_day); an older one would show
+    # finished or earlier games as today's if the first poll fails
+    age = time.time() - saved_at
+    if age < SCOREBOARD_MAX_AGE and datetime.fromtimestamp(saved_at).date() == datetime.now().date():
+        scoreboard_poller.restore(snapshot.get('scoreboard'))
+    return age
+
+
+def prefetch():
+    """Load the season feed and the current week's odds, so the first session finds them cached."""
+    week_index = get_week_index()
+    if not week_index:
+        return
+    week = week_index.current_week()
+    events = week_index.events_for_week(week) if week is not None else None
+    if events:
+        fetch_week_odds(events, odds_store)
+
+
+def start():
+    """Restore the last snapshot, then prefetch and keep saving snapshots in the background."""
+    if SNAPSHOT_DIR:
+        path = os.path.join(SNAPSHOT_DIR, SNAPSHOT_FILE)
+        age = restore_snapshot(path)
+        if age is not None:
+            logger.info("Restored snapshot from %.0f seconds ago", age)
+        threading.Thread(target=_save_periodically, args=(path,), name='snapshot-writer', daemon=True).start()
+        atexit.register(_save_quietly, path)
+    threading.Thread(target=_prefetch_quietly, name='prefetch', daemon=True).start()
+
+
+def _prefetch_quietly():
+    try:
+        prefetch()
+    except Exception:
+        logger.exception("Prefetch failed")
+
+
+def _save_quietly(path):
+    try:
+        save_snapshot(path)
+    except Exception:
+        logger.exception("Saving snapshot failed")
+
+
+def _save_periodically(path):
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        _save_quietly(path)
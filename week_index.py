@@ -0,0 +1,93 @@
+# week_index.py
+import hashlib
+import json
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """Convert an ESPN 'YYYY-MM-DDTHH:MMZ' timestamp to epoch seconds."""
+    return int(datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc).timestamp())
+
+
+class WeekIndex:
+    """Week boundaries and per-week event buckets, built once per season feed."""
+
+    def __init__(self, feed):
+        self.options = []  # Week selector options, in week order
+        self.version = None  # Token identifying the calendar the week numbers refer to
+        self.events = {}  # event ID -> event
+        self._starts = []  # Sorted week start times (epoch seconds)
+        self._ends = []  # Week end times, parallel to _starts
+        self._weeks = []  # Week numbers, parallel to _starts
+        self._week_events = []  # Week number -> event IDs
+        self._kickoffs = []  # Sorted event kickoff times (epoch seconds)
+        self._kickoff_ids = []  # Event IDs, parallel to _kickoffs
+
+        leagues_data = feed.get('leagues', [])
+        calendar_data = leagues_data[0].get('calendar', []) if leagues_data else []
+
+        boundaries = []
+        for period in calendar_data:
+            for week in period.get('entries', []):
+                week_number = len(self.options)
+                start = parse_timestamp(week['startDate'])
+                end = parse_timestamp(week['endDate'])
+                start_label = datetime.fromtimestamp(start, timezone.utc).strftime('%m/%d')
+                end_label = datetime.fromtimestamp(end, timezone.utc).strftime('%m/%d')
+                self.options.append({'label': f"{week['label']}: {start_label} - {end_label}",
+                                     'value': week_number})
+                self._week_events.append([])
+                boundaries.append((start, end, week_number))
+
+        self.version = hashlib.blake2b(json.dumps(self.options).encode(), digest_size=8).hexdigest()
+
+        boundaries.sort()
+        self._starts = [start for start, _, _ in boundaries]
+        self._ends = [end for _, end, _ in boundaries]
+        self._weeks = [week_number for _, _, week_number in boundaries]
+
+        kickoffs = []
+        for event in feed.get('events', []):
+            self.events[event['id']] = event
+            kickoff = parse_timestamp(event['date'])
+            kickoffs.append((kickoff, event['id']))
+            week_number = self.week_at(kickoff)
+            if week_number is not None:
+                self._week_events[week_number].append(event['id'])
+
+        kickoffs.sort()
+        self._kickoffs = [kickoff for kickoff, _ in kickoffs]
+        self._kickoff_ids = [event_id for _, event_id in kickoffs]
+
+    def __len__(self):
+        return len(self.options)
+
+    def week_at(self, timestamp):
+        """Return the week number containing an epoch timestamp, or None."""
+        position = bisect_right(self._starts, timestamp) - 1
+        if position >= 0 and timestamp <= self._ends[position]:
+            return self._weeks[position]
+        return None
+
+    def current_week(self):
+        """Return the week number containing the current time, or None outside the season."""
+        return self.week_at(time.time())
+
+    def events_between(self, start, end):
+        """Return the events kicking off between two epoch timestamps, inclusive."""
+        first = bisect_left(self._kickoffs, start)
+        last = bisect_right(self._kickoffs, end)
+        return [self.events[event_id] for event_id in self._kickoff_ids[first:last]]
+
+    def next_kickoff(self, timestamp):
+        """Return the first kickoff time after an epoch timestamp, or None if the season is over."""
+        position = bisect_right(self._kickoffs, timestamp)
+        return self._kickoffs[position] if position < len(self._kickoffs) else None
+
+    def events_for_week(self, week_number):
+        """Return the events scheduled in a week, or None if the week does not exist."""
+        if week_number is None or not 0 <= week_number < len(self._week_events):
+            return None
+        return [self.events[event_id] for event_id in self._week_events[week_number]]